@@ -1,10 +1,12 @@
 # auctions/admin.py
 
 from django.contrib import admin
-from django.utils.html import format_html
+from django.utils.html import format_html, format_html_join
 from django.urls import reverse
 from django.contrib.auth.admin import UserAdmin
 
+from . import bidding
+from .admin_tools import AutocompleteFilter, AutocompleteFilterMixin, EstimatedCountPaginator
 from .models import (
     User,
     Category,
@@ -13,11 +15,25 @@ from .models import (
     Comment,
     Watchlist,
     Notification,
+    ProxyBid,
+    AuctionEvent,
+    UserAuctionStats,
+    ArchivedListing,
+    ProfileRun,
+    SlowQueryStat,
 )
 
 
+class ListingLinkMixin:
+    # the title only: Listing.__str__ looks up the current price
+    def listing_link(self, obj):
+        url = reverse("admin:auctions_listing_change", args=(obj.listing_id,))
+        return format_html('<a href="{}">{}</a>', url, obj.listing.title)
+    listing_link.short_description = "Listing"
+
+
 @admin.register(Listing)
-class ListingAdmin(admin.ModelAdmin):
+class ListingAdmin(AutocompleteFilterMixin, admin.ModelAdmin):
     list_display = (
         "id",
         "title",
@@ -28,15 +44,25 @@ class ListingAdmin(admin.ModelAdmin):
         "category",
         "created_at",
     )
-    list_filter = ("active", "category", "created_at", "owner")
+    list_filter = ("active", "category", "created_at", ("owner", AutocompleteFilter))
+    list_select_related = ("owner", "winner", "category")
     search_fields = ("title", "description", "owner__username")
     readonly_fields = ("created_at", "winner")
+    autocomplete_fields = ("owner", "category")
+    ordering = ("-id",)
     actions = ("close_auctions", "reopen_auctions")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        # current price as a subquery instead of one query per row
+        return super().get_queryset(request).with_prices()
 
     def current_price_display(self, obj):
         price = obj.current_price()
         return f"${price:.2f}"
     current_price_display.short_description = "Current Price"
+    current_price_display.admin_order_field = "price"
 
     def winner_display(self, obj):
         return obj.winner.username if obj.winner else "-"
@@ -48,56 +74,56 @@ class ListingAdmin(admin.ModelAdmin):
         as the winner (if any) and mark active=False.
         """
         closed_count = 0
-        for listing in queryset.filter(active=True):
-            top_bid = listing.bids.order_by("-amount", "-timestamp").first()
-            if top_bid:
-                listing.winner = top_bid.bidder
-            else:
-                listing.winner = None
-            listing.active = False
-            listing.save()
-            closed_count += 1
+        for listing_id in queryset.filter(active=True).values_list("id", flat=True):
+            _, _, closed = bidding.close_listing(listing_id)
+            closed_count += closed
         self.message_user(request, f"Closed {closed_count} auction(s).")
     close_auctions.short_description = "Close selected auctions"
 
     def reopen_auctions(self, request, queryset):
         """
         Reopen selected auctions. Mark active=True and clear winner so auction
-        can accept new bids again.
+        can accept new bids again (the previous winner stays in the ledger).
         """
         reopened_count = 0
-        for listing in queryset.filter(active=False):
-            listing.active = True
-            listing.winner = None
-            listing.save()
-            reopened_count += 1
+        for listing_id in queryset.filter(active=False).values_list("id", flat=True):
+            _, reopened = bidding.reopen_listing(listing_id)
+            reopened_count += reopened
         self.message_user(request, f"Reopened {reopened_count} auction(s).")
     reopen_auctions.short_description = "Reopen selected auctions"
 
 
 @admin.register(Bid)
-class BidAdmin(admin.ModelAdmin):
+class BidAdmin(AutocompleteFilterMixin, ListingLinkMixin, admin.ModelAdmin):
     list_display = ("id", "listing_link", "bidder", "amount", "timestamp")
-    list_filter = ("timestamp", "bidder")
+    list_filter = ("timestamp", ("bidder", AutocompleteFilter), ("listing", AutocompleteFilter))
+    list_select_related = ("listing", "bidder")
     search_fields = ("listing__title", "bidder__username")
-    ordering = ("-amount", "-timestamp")
+    autocomplete_fields = ("listing", "bidder")
+    # newest first walks the primary key index; sorting by amount scans every bid
+    ordering = ("-id",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
-    def listing_link(self, obj):
-        url = reverse("admin:auctions_listing_change", args=(obj.listing.id,))
-        return format_html('<a href="{}">{}</a>', url, obj.listing.title)
-    listing_link.short_description = "Listing"
+
+@admin.register(ProxyBid)
+class ProxyBidAdmin(ListingLinkMixin, admin.ModelAdmin):
+    list_display = ("id", "listing_link", "bidder", "max_amount", "placed_at")
+    list_select_related = ("listing", "bidder")
+    search_fields = ("listing__title", "bidder__username")
+    list_filter = ("placed_at",)
+    autocomplete_fields = ("listing", "bidder")
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(ListingLinkMixin, admin.ModelAdmin):
     list_display = ("id", "listing_link", "commenter", "short_content", "timestamp")
+    list_select_related = ("listing", "commenter")
     search_fields = ("content", "commenter__username", "listing__title")
     list_filter = ("timestamp",)
-
-    def listing_link(self, obj):
-        url = reverse("admin:auctions_listing_change", args=(obj.listing.id,))
-        return format_html('<a href="{}">{}</a>', url, obj.listing.title)
-    listing_link.short_description = "Listing"
+    autocomplete_fields = ("listing", "commenter")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     def short_content(self, obj):
         return (obj.content[:75] + "...") if len(obj.content) > 75 else obj.content
@@ -111,10 +137,14 @@ class CategoryAdmin(admin.ModelAdmin):
 
 
 @admin.register(Watchlist)
-class WatchlistAdmin(admin.ModelAdmin):
-    list_display = ("id", "user", "listing", "added_at")
+class WatchlistAdmin(ListingLinkMixin, admin.ModelAdmin):
+    list_display = ("id", "user", "listing_link", "added_at")
+    list_select_related = ("user", "listing")
     search_fields = ("user__username", "listing__title")
     list_filter = ("added_at",)
+    autocomplete_fields = ("user", "listing")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 # Register the custom User model with default UserAdmin
@@ -125,4 +155,125 @@ admin.site.register(User, UserAdmin)
 class NotificationAdmin(admin.ModelAdmin):
     list_display = ("id", "recipient", "title", "owner_email", "read", "created_at")
     list_filter = ("read", "created_at")
+    list_select_related = ("recipient",)
     search_fields = ("recipient__username", "title", "message", "owner_email")
+    autocomplete_fields = ("recipient", "listing")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(AuctionEvent)
+class AuctionEventAdmin(admin.ModelAdmin):
+    list_display = ("id", "listing_id", "sequence", "kind", "user_id", "amount", "created_at")
+    list_filter = ("kind",)
+    search_fields = ("listing__title",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    # append-only: viewable, never editable
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(UserAuctionStats)
+class UserAuctionStatsAdmin(admin.ModelAdmin):
+    list_display = ("user", "bids_placed", "auctions_won", "amount_won")
+    list_select_related = ("user",)
+    search_fields = ("user__username",)
+
+
+@admin.register(ArchivedListing)
+class ArchivedListingAdmin(admin.ModelAdmin):
+    list_display = ("id", "title", "owner", "winner", "final_price", "closed_at", "archived_at")
+    list_select_related = ("owner", "winner")
+    search_fields = ("title",)
+    list_filter = ("archived_at",)
+    exclude = ("payload",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ProfileRun)
+class ProfileRunAdmin(admin.ModelAdmin):
+    list_display = (
+        "created_at", "method", "path", "status_code", "total_ms", "sql_count", "sql_ms",
+        "template_ms", "trigger", "user",
+    )
+    list_filter = ("trigger", "view_name")
+    list_select_related = ("user",)
+    search_fields = ("path", "view_name")
+    fields = (
+        "created_at", "method", "path", "view_name", "user", "trigger", "status_code",
+        "total_ms", "sql_count", "sql_ms", "template_ms", "download", "summary_text",
+        "template_table", "sql_table",
+    )
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def download(self, obj):
+        url = reverse("profile_download", args=(obj.pk,))
+        return format_html('<a href="{}">profile-{}.prof</a> (open with snakeviz or pstats)', url, obj.pk)
+    download.short_description = "cProfile data"
+
+    def summary_text(self, obj):
+        return format_html("<pre>{}</pre>", obj.summary)
+    summary_text.short_description = "Top functions (cumulative)"
+
+    def template_table(self, obj):
+        return format_html_join(
+            "\n", "<div>{}{} — {} ms</div>",
+            (("\u00a0\u00a0" * t["depth"], t["name"], t["ms"]) for t in obj.templates),
+        )
+    template_table.short_description = "Templates"
+
+    def sql_table(self, obj):
+        slowest = sorted(obj.queries, key=lambda q: q["ms"], reverse=True)
+        return format_html_join(
+            "\n", "<div><strong>{} ms</strong> [{}] <code>{}</code></div>",
+            ((q["ms"], q["alias"], q["sql"]) for q in slowest),
+        )
+    sql_table.short_description = "SQL (slowest first)"
+
+
+@admin.register(SlowQueryStat)
+class SlowQueryStatAdmin(admin.ModelAdmin):
+    list_display = ("short_pattern", "count", "total_ms", "avg_ms", "max_ms", "last_view", "last_seen")
+    search_fields = ("pattern", "last_view")
+    fields = (
+        "pattern", "count", "total_ms", "max_ms", "first_seen", "last_seen", "last_view",
+        "last_frame", "explain_text", "explained_at",
+    )
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def short_pattern(self, obj):
+        return (obj.pattern[:120] + "...") if len(obj.pattern) > 120 else obj.pattern
+    short_pattern.short_description = "Query"
+
+    def avg_ms(self, obj):
+        return round(obj.total_ms / obj.count, 1) if obj.count else None
+    avg_ms.short_description = "Avg ms"
+
+    def explain_text(self, obj):
+        return format_html("<pre>{}</pre>", obj.explain) if obj.explain else "-"
+    explain_text.short_description = "EXPLAIN (ANALYZE, BUFFERS)"
@@ -0,0 +1,110 @@
+"""
+Hot/cold archival of closed auctions.
+
+Listings closed for longer than a cutoff are copied, together with their bids,
+comments and notifications, into ArchivedListing (one compressed JSON document
+each) and then deleted from the hot tables, in bounded batches. The
+AuctionEvent ledger is untouched, so the history stays replayable.
+"""
+
+import json
+import zlib
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ArchivedListing, Bid, Listing
+
+
+def archivable(days):
+    """Closed listings whose auction ended more than ``days`` ago."""
+    cutoff = timezone.now() - timedelta(days=days)
+    return Listing.objects.filter(active=False).filter(
+        Q(closed_at__lt=cutoff)
+        # closed before closed_at existed: fall back to the creation date
+        | Q(closed_at__isnull=True, created_at__lt=cutoff)
+    )
+
+
+def _document(listing):
+    bids = listing.bids.select_related("bidder").order_by("timestamp", "id")
+    comments = listing.comments.select_related("commenter").order_by("timestamp", "id")
+    return {
+        "listing": {
+            "id": listing.id,
+            "title": listing.title,
+            "description": listing.description,
+            "starting_bid": str(listing.starting_bid),
+            "image_url": listing.image_url,
+            "category": listing.category.name if listing.category else None,
+            "owner": listing.owner.username,
+            "winner": listing.winner.username if listing.winner else None,
+            "created_at": listing.created_at.isoformat(),
+            "closed_at": listing.closed_at.isoformat() if listing.closed_at else None,
+        },
+        "bids": [
+            {"bidder": b.bidder.username, "amount": str(b.amount), "timestamp": b.timestamp.isoformat()}
+            for b in bids
+        ],
+        "comments": [
+            {"commenter": c.commenter.username, "content": c.content, "timestamp": c.timestamp.isoformat()}
+            for c in comments
+        ],
+        "notifications": list(
+            listing.notifications.values("recipient_id", "title", "message", "url", "read", "created_at")
+        ),
+        "watchers": listing.watched_by.count(),
+    }
+
+
+def archive_batch(days, batch_size):
+    """
+    Archive up to ``batch_size`` listings in one transaction.
+    Returns the number archived (0 when there is nothing left to do).
+
+    The listings are locked first (skipping any a concurrent transaction
+    holds, e.g. an admin reopening one), and the lock re-checks that they
+    are still closed and past the cutoff. Their bids are deleted with a
+    single statement rather than through the cascade, which would load
+    every bid and send a post_delete signal for each.
+    """
+    with transaction.atomic():
+        ids = list(
+            archivable(days)
+            .select_for_update(skip_locked=True)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return 0
+        # no FOR UPDATE here: PostgreSQL rejects it next to with_prices' aggregate
+        listings = list(
+            Listing.objects.filter(pk__in=ids)
+            .select_related("owner", "winner", "category")
+            .with_prices()
+            .order_by("id")
+        )
+        ArchivedListing.objects.bulk_create([
+            ArchivedListing(
+                id=listing.id,
+                title=listing.title,
+                owner_id=listing.owner_id,
+                winner_id=listing.winner_id,
+                final_price=listing.price,
+                created_at=listing.created_at,
+                closed_at=listing.closed_at,
+                payload=zlib.compress(
+                    json.dumps(_document(listing), default=str).encode("utf-8"), 6
+                ),
+            )
+            for listing in listings
+        ])
+        # The bid_changed receiver only drops cached price series, and those
+        # of a deleted listing are never served again.
+        bids = Bid.objects.filter(listing_id__in=ids)
+        bids._raw_delete(bids.db)
+        # cascades to comments, watchlist, notifications and proxy bids
+        Listing.objects.filter(pk__in=ids).delete()
+    return len(listings)
@@ -0,0 +1,210 @@
+"""
+Front-end asset pipeline.
+
+Bootstrap is vendored under ``auctions/static/auctions/vendor`` and, together
+with our own stylesheet, concatenated into a single bundle that only keeps the
+rules whose class selectors are actually referenced by the templates/forms.
+The layout loads it as a normal stylesheet: a layout-only critical subset
+inlined in the head left the cards, forms and alerts unstyled until the
+rest arrived, and one covering them would be about as large as the bundle.
+
+The bundles are built by ``manage.py build_assets`` and automatically before
+``collectstatic``; WhiteNoise's CompressedManifestStaticFilesStorage then
+fingerprints them and writes the gzip (and, with ``Brotli`` installed, .br)
+variants.
+"""
+
+import re
+import urllib.request
+from pathlib import Path
+
+BOOTSTRAP_VERSION = "5.3.3"
+BOOTSTRAP_CDN = f"https://cdn.jsdelivr.net/npm/bootstrap@{BOOTSTRAP_VERSION}/dist"
+
+APP_DIR = Path(__file__).resolve().parent
+STATIC_DIR = APP_DIR / "static" / "auctions"
+VENDOR_DIR = STATIC_DIR / "vendor" / "bootstrap"
+DIST_DIR = STATIC_DIR / "dist"
+TEMPLATE_DIR = APP_DIR / "templates" / "auctions"
+
+# Static paths (relative to STATIC_URL) used by the templates
+CSS_BUNDLE = "auctions/dist/app.css"
+JS_BUNDLE = "auctions/dist/app.js"
+
+# vendored file name -> CDN source
+VENDOR_FILES = {
+    "bootstrap.min.css": f"{BOOTSTRAP_CDN}/css/bootstrap.min.css",
+    "bootstrap.bundle.min.js": f"{BOOTSTRAP_CDN}/js/bootstrap.bundle.min.js",
+}
+
+# Our stylesheets appended after Bootstrap, in order
+LOCAL_CSS = ["css/site-textlogo.css"]
+
+# Where class names can come from besides the templates (widget attrs)
+EXTRA_SOURCES = [APP_DIR / "forms.py"]
+
+# Classes Bootstrap's JS adds at runtime, never present in our markup
+SAFELIST = {
+    "show", "showing", "hiding", "collapsing", "active", "fade", "disabled",
+    "carousel-item-start", "carousel-item-end", "carousel-item-next",
+    "carousel-item-prev", "pointer-event", "was-validated", "is-invalid",
+    "is-valid", "modal-open", "modal-backdrop", "offcanvas-backdrop",
+}
+
+_COMMENT_RE = re.compile(r"/\*(?!!).*?\*/", re.S)
+_SOURCEMAP_RE = re.compile(r"\n?(/\*# sourceMappingURL=[^*]*\*/|//# sourceMappingURL=\S*)\s*$")
+_TOKEN_RE = re.compile(r"[A-Za-z_][\w-]*")
+_CLASS_RE = re.compile(r"\.(-?[_A-Za-z][\w-]*)")
+_NOT_RE = re.compile(r":not\((?:[^()]|\([^()]*\))*\)")
+_NESTED_AT_RULES = ("@media", "@supports", "@layer", "@container")
+
+
+def strip_source_maps(text):
+    """Drop trailing sourceMappingURL comments (the .map files are not shipped)."""
+    return _SOURCEMAP_RE.sub("", text)
+
+
+def vendor_bootstrap(force=False):
+    """
+    Download the pinned Bootstrap dist files into VENDOR_DIR unless already
+    present. Returns the list of files written.
+    """
+    VENDOR_DIR.mkdir(parents=True, exist_ok=True)
+    written = []
+    for name, url in VENDOR_FILES.items():
+        target = VENDOR_DIR / name
+        if target.exists() and not force:
+            continue
+        with urllib.request.urlopen(url, timeout=30) as resp:
+            text = resp.read().decode("utf-8")
+        target.write_text(strip_source_maps(text), encoding="utf-8")
+        written.append(target)
+    return written
+
+
+def collect_tokens(paths):
+    """Every identifier-like token in the given files; a superset of used classes."""
+    tokens = set(SAFELIST)
+    for path in paths:
+        tokens.update(_TOKEN_RE.findall(path.read_text(encoding="utf-8")))
+    return tokens
+
+
+def _blocks(css):
+    """
+    Yield ``(prelude, body)`` for each top-level rule of ``css``. Statement
+    at-rules (``@charset``, ``@import``) are yielded with ``body=None``.
+    """
+    depth = 0
+    start = 0
+    prelude_end = 0
+    quote = None
+    i = 0
+    n = len(css)
+    while i < n:
+        ch = css[i]
+        if quote:
+            if ch == "\\":
+                i += 1
+            elif ch == quote:
+                quote = None
+        elif ch in "\"'":
+            quote = ch
+        elif ch == "{":
+            if depth == 0:
+                prelude_end = i
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                yield css[start:prelude_end].strip(), css[prelude_end + 1:i]
+                start = i + 1
+        elif ch == ";" and depth == 0:
+            yield css[start:i].strip(), None
+            start = i + 1
+        i += 1
+
+
+def _split_selectors(prelude):
+    """Split a selector list on top-level commas (ignoring those inside parens)."""
+    parts, depth, start = [], 0, 0
+    for i, ch in enumerate(prelude):
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            parts.append(prelude[start:i])
+            start = i + 1
+    parts.append(prelude[start:])
+    return parts
+
+
+def _selector_used(selector, used):
+    classes = _CLASS_RE.findall(_NOT_RE.sub("", selector))
+    return all(c in used for c in classes)
+
+
+def subset_css(css, used):
+    """
+    Keep only the rules of ``css`` whose selectors reference classes in ``used``.
+    Selectors without classes (element, :root, attribute) are always kept, as
+    are @font-face/@keyframes blocks; @media/@supports are filtered recursively.
+    """
+    out = []
+    for prelude, body in _blocks(_COMMENT_RE.sub("", css)):
+        if body is None:
+            if prelude:
+                out.append(prelude + ";")
+        elif prelude.startswith(_NESTED_AT_RULES):
+            inner = subset_css(body, used)
+            if inner:
+                out.append(f"{prelude}{{{inner}}}")
+        elif prelude.startswith("@"):
+            out.append(f"{prelude}{{{body}}}")
+        else:
+            kept = [s.strip() for s in _split_selectors(prelude) if _selector_used(s, used)]
+            if kept:
+                out.append(f"{','.join(kept)}{{{body.strip()}}}")
+    return "".join(out)
+
+
+def template_files():
+    """Every project template, includes (templates/auctions/includes/) too."""
+    return sorted(TEMPLATE_DIR.rglob("*.html"))
+
+
+def render_bundles():
+    """Contents of the CSS/JS bundles, ``{static path: text}``."""
+    used = collect_tokens(template_files() + EXTRA_SOURCES)
+
+    bootstrap_css = strip_source_maps((VENDOR_DIR / "bootstrap.min.css").read_text(encoding="utf-8"))
+    local_css = "\n".join(
+        (STATIC_DIR / name).read_text(encoding="utf-8") for name in LOCAL_CSS
+    )
+    full_css = bootstrap_css + "\n" + local_css
+
+    return {
+        CSS_BUNDLE: subset_css(full_css, used),
+        JS_BUNDLE: strip_source_maps(
+            (VENDOR_DIR / "bootstrap.bundle.min.js").read_text(encoding="utf-8")
+        ),
+    }
+
+
+def build_bundles(vendor=True):
+    """
+    Build the CSS/JS bundles into DIST_DIR.
+    Returns a dict of ``{static path: size in bytes}``.
+    """
+    if vendor:
+        vendor_bootstrap()
+
+    outputs = render_bundles()
+    DIST_DIR.mkdir(parents=True, exist_ok=True)
+    sizes = {}
+    for static_path, content in outputs.items():
+        target = STATIC_DIR.parent / static_path
+        target.write_text(content, encoding="utf-8")
+        sizes[static_path] = target.stat().st_size
+    return sizes
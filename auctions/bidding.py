@@ -0,0 +1,162 @@
+"""
+Bidding engine with proxy (automatic) bidding.
+
+A bidder may place a visible bid, store a hidden maximum (ProxyBid), or both.
+All competing maxima are then resolved in the same transaction, producing
+only the visible Bid rows a human bidding war would have ended with: at most
+one row for the strongest rival (at their maximum) and one for the winner
+(one increment above it, capped at the winner's maximum).
+"""
+
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import ledger
+from .models import AuctionEvent, Bid, Listing, ProxyBid
+
+
+class BidError(Exception):
+    """A bid was rejected; the message is shown to the bidder."""
+
+
+def bid_increment():
+    return Decimal(str(getattr(settings, "AUCTION_BID_INCREMENT", "1.00")))
+
+
+def _top_bid(listing):
+    return listing.bids.order_by("-amount", "-timestamp").first()
+
+
+def _create_bid(listing, bidder, amount):
+    bid = Bid.objects.create(listing=listing, bidder=bidder, amount=amount)
+    ledger.record_bid(bid)
+    return bid
+
+
+def resolve_proxies(listing):
+    """
+    Let stored maxima respond to the current visible state of ``listing``.
+    The caller must hold the listing's row lock. Returns the Bids created.
+    """
+    top = _top_bid(listing)
+    candidates = listing.proxy_bids.select_related("bidder").order_by("-max_amount", "placed_at")
+    if top is not None:
+        candidates = candidates.filter(max_amount__gt=top.amount)
+    else:
+        candidates = candidates.filter(max_amount__gte=listing.starting_bid)
+    candidates = list(candidates[:2])
+    if not candidates:
+        return []
+
+    leader = candidates[0]
+    rival = candidates[1] if len(candidates) > 1 else None
+    created = []
+
+    if top is not None and top.bidder_id == leader.bidder_id and rival is None:
+        # already winning and nobody can outbid them
+        return created
+
+    # the amount the leader has to beat: the rival's maximum or the visible price
+    if rival is not None:
+        to_beat = rival.max_amount
+        if rival.max_amount < leader.max_amount:
+            # the rival's proxy bids all the way up to its maximum
+            created.append(_create_bid(listing, rival.bidder, rival.max_amount))
+    else:
+        to_beat = top.amount if top is not None else None
+
+    if to_beat is None:
+        amount = listing.starting_bid
+    else:
+        # on equal maxima the earlier proxy (the leader) wins at that amount
+        amount = min(leader.max_amount, to_beat + bid_increment())
+    created.append(_create_bid(listing, leader.bidder, amount))
+    return created
+
+
+@transaction.atomic
+def place_bid(listing_id, bidder, amount=None, max_amount=None):
+    """
+    Place a visible bid of ``amount`` and/or set a hidden maximum
+    ``max_amount`` for ``bidder``, then resolve all proxies.
+
+    Returns ``(listing, bids)`` where ``bids`` are the visible Bids created in
+    order (the last one is the new highest bid). Raises BidError.
+    """
+    listing = Listing.objects.select_for_update().get(pk=listing_id)
+    if not listing.active:
+        raise BidError("This auction is closed.")
+    if amount is None and max_amount is None:
+        raise BidError("Enter a bid or a maximum bid.")
+
+    top = _top_bid(listing)
+    offer = amount if amount is not None else max_amount
+    if offer < listing.starting_bid:
+        raise BidError("Bid must be at least the starting bid.")
+    if top is not None and offer <= top.amount:
+        raise BidError("Bid must be greater than the current highest bid.")
+
+    created = []
+    if amount is not None:
+        created.append(_create_bid(listing, bidder, amount))
+
+    if max_amount is not None and (amount is None or max_amount > amount):
+        proxy = ProxyBid.objects.filter(listing=listing, bidder=bidder).first()
+        if proxy is None:
+            ProxyBid.objects.create(listing=listing, bidder=bidder, max_amount=max_amount)
+        elif max_amount > proxy.max_amount:
+            proxy.max_amount = max_amount
+            proxy.placed_at = timezone.now()
+            proxy.save(update_fields=["max_amount", "placed_at"])
+        else:
+            raise BidError("Your new maximum must be higher than your current maximum.")
+
+    created.extend(resolve_proxies(listing))
+    return listing, created
+
+
+@transaction.atomic
+def close_listing(listing_id):
+    """
+    Close the auction; the highest bidder (if any) becomes the winner.
+    Returns ``(listing, top_bid, closed)``; ``closed`` is False when the
+    listing was already closed (nothing changes).
+    """
+    listing = Listing.objects.select_for_update().get(pk=listing_id)
+    top = _top_bid(listing)
+    if not listing.active:
+        return listing, top, False
+    listing.winner = top.bidder if top else None
+    listing.active = False
+    listing.closed_at = timezone.now()
+    listing.save()
+    ledger.record(listing, AuctionEvent.LISTING_CLOSED, amount=top.amount if top else None)
+    if top is not None:
+        ledger.record(listing, AuctionEvent.WINNER_SET, user=top.bidder, amount=top.amount)
+    return listing, top, True
+
+
+@transaction.atomic
+def reopen_listing(listing_id):
+    """
+    Reopen a closed auction and clear its winner; the ledger keeps who the
+    winner was. Returns ``(listing, reopened)``.
+    """
+    listing = Listing.objects.select_for_update().get(pk=listing_id)
+    if listing.active:
+        return listing, False
+    top = _top_bid(listing)
+    ledger.record(
+        listing,
+        AuctionEvent.LISTING_REOPENED,
+        user=listing.winner,
+        amount=top.amount if listing.winner and top else None,
+    )
+    listing.active = True
+    listing.winner = None
+    listing.closed_at = None
+    listing.save()
+    return listing, True
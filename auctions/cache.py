@@ -0,0 +1,52 @@
+"""
+Cache helpers: a health probe for the configured cache tier and a small
+registry of warm-up functions that fill the cache after a deploy/restart.
+"""
+
+import time
+import uuid
+
+from django.core.cache import caches
+
+_warmers = []
+
+
+def warmer(func):
+    """Register ``func`` to be run by ``warm_cache()``."""
+    _warmers.append(func)
+    return func
+
+
+def warm_cache():
+    """Run every registered warmer; returns ``{name: seconds}``."""
+    timings = {}
+    for func in _warmers:
+        start = time.perf_counter()
+        func()
+        timings[func.__name__] = time.perf_counter() - start
+    return timings
+
+
+def cache_health(alias="default"):
+    """
+    Round-trip a probe key through the cache ``alias``.
+    Returns a dict with the backend name, ``ok`` and the latency in ms.
+    """
+    cache = caches[alias]
+    key = f"health:{uuid.uuid4().hex}"
+    start = time.perf_counter()
+    try:
+        cache.set(key, "ok", timeout=10)
+        ok = cache.get(key) == "ok"
+        cache.delete(key)
+        error = None
+    except Exception as exc:  # connection refused, missing redis package, ...
+        ok = False
+        error = str(exc)
+    return {
+        "alias": alias,
+        "backend": f"{type(cache).__module__}.{type(cache).__name__}",
+        "ok": ok,
+        "latency_ms": (time.perf_counter() - start) * 1000,
+        "error": error,
+    }
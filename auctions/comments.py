@@ -0,0 +1,48 @@
+"""
+Listing comments in keyset pages on Comment.id, with the commenter's
+username joined in. ``older`` pages back from the newest comment (what the
+listing page renders first); ``newer`` returns what was posted after a given
+id (appending new comments without reloading the page).
+"""
+
+from .models import Comment
+
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+FIELDS = ("id", "content", "timestamp", "commenter__username")
+
+
+def _serialize(rows):
+    return [
+        {
+            "id": row["id"],
+            "commenter": row["commenter__username"],
+            "content": row["content"],
+            "timestamp": row["timestamp"],
+        }
+        for row in rows
+    ]
+
+
+def older(listing_id, before=None, limit=PAGE_SIZE):
+    """
+    Up to ``limit`` comments older than comment id ``before`` (the newest when
+    None), oldest first. Returns ``(comments, more)``.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    qs = Comment.objects.filter(listing_id=listing_id)
+    if before is not None:
+        qs = qs.filter(id__lt=before)
+    rows = list(qs.order_by("-id").values(*FIELDS)[:limit + 1])
+    return _serialize(reversed(rows[:limit])), len(rows) > limit
+
+
+def newer(listing_id, after, limit=PAGE_SIZE):
+    """Up to ``limit`` comments after comment id ``after``, oldest first. Returns ``(comments, more)``."""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    rows = list(
+        Comment.objects.filter(listing_id=listing_id, id__gt=after)
+        .order_by("id").values(*FIELDS)[:limit + 1]
+    )
+    return _serialize(rows[:limit]), len(rows) > limit
@@ -1,5 +1,19 @@
+from .directory import get_directory
+from .user_state import listing_state as _listing_state
+
+
 def notifications_count(request):
     if request.user.is_authenticated:
         unread = request.user.notifications.filter(read=False).count()
         return {"notifications_unread_count": unread}
     return {"notifications_unread_count": 0}
+
+
+def category_directory(request):
+    # Passed uncalled: the template engine calls it only if a page uses it
+    return {"category_directory": get_directory}
+
+
+def listing_state(request):
+    # Views preload the listings they show, see auctions.user_state
+    return {"listing_state": _listing_state(request)}
@@ -0,0 +1,99 @@
+"""
+Category directory: every category with its active-listing count and the
+current price range of those listings.
+
+Computed with one grouped aggregate and cached twice: in the shared cache
+(so all workers reuse one computation) and in-process for LOCAL_TTL seconds
+(so most requests only fetch a small version key from the cache backend).
+Listing and category saves/deletes bump that version after commit, see
+auctions.signals, which every worker notices on its next request. Without a
+shared cache (settings.CACHE_SHARED) each worker has its own version, so
+entries are kept for LOCAL_TTL only: other workers lag by at most that
+long. Bids only move the price range, which is allowed to lag by up to the
+cache timeout.
+"""
+
+import time
+import uuid
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max, Min
+
+from .cache import warmer
+from .models import Category, Listing
+
+CACHE_KEY = "category-directory:v2"
+VERSION_KEY = "category-directory:version"
+SHARED_TTL = 300
+LOCAL_TTL = 30
+
+_local = {"entries": None, "version": None, "expires": 0.0}
+
+
+@dataclass(frozen=True)
+class CategoryEntry:
+    id: int
+    name: str
+    active_count: int = 0
+    min_price: Optional[Decimal] = None
+    max_price: Optional[Decimal] = None
+
+
+def _compute():
+    stats = {
+        row["category"]: row
+        for row in Listing.objects.filter(active=True, category__isnull=False)
+        .with_prices()
+        .values("category")
+        .annotate(active_count=Count("id"), min_price=Min("price"), max_price=Max("price"))
+        .order_by()
+    }
+    entries = []
+    for pk, name in Category.objects.order_by("name").values_list("id", "name"):
+        row = stats.get(pk, {})
+        entries.append(CategoryEntry(
+            id=pk,
+            name=name,
+            active_count=row.get("active_count", 0),
+            min_price=row.get("min_price"),
+            max_price=row.get("max_price"),
+        ))
+    return entries
+
+
+def _version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def get_directory():
+    """Return the list of CategoryEntry, ordered by name."""
+    now = time.monotonic()
+    version = _version()
+    if _local["entries"] is not None and _local["version"] == version and _local["expires"] > now:
+        return _local["entries"]
+    key = f"{CACHE_KEY}:{version}"
+    entries = cache.get(key)
+    if entries is None:
+        entries = _compute()
+        cache.set(key, entries, SHARED_TTL if settings.CACHE_SHARED else LOCAL_TTL)
+    _local.update(entries=entries, version=version, expires=now + LOCAL_TTL)
+    return entries
+
+
+def invalidate_directory():
+    _local["entries"] = None
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+@warmer
+def warm_category_directory():
+    invalidate_directory()
+    get_directory()
@@ -1,4 +1,5 @@
 from django import forms
+from .directory import get_directory
 from .models import Listing, Comment
 
 class ListingForm(forms.ModelForm):
@@ -30,8 +31,12 @@ class ListingForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        # Friendly empty label for the category select
+        # Friendly empty label for the category select; options come from the
+        # cached category directory (the queryset is only used to validate)
         self.fields['category'].empty_label = "Select a category"
+        self.fields['category'].choices = [("", self.fields['category'].empty_label)] + [
+            (entry.id, entry.name) for entry in get_directory()
+        ]
         # Make sure starting_bid is required and has sensible validation
         self.fields['starting_bid'].required = True
         self.fields['title'].required = True
@@ -43,6 +48,7 @@ class BidForm(forms.Form):
         max_digits=10,
         decimal_places=2,
         min_value=0.01,
+        required=False,
         widget=forms.NumberInput(attrs={
             'class': 'form-control',
             'placeholder': 'Enter your bid (e.g. 150.00)',
@@ -50,6 +56,29 @@ class BidForm(forms.Form):
             'min': '0.01'
         })
     )
+    # Optional hidden maximum: the engine bids for the user up to this amount
+    max_amount = forms.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        min_value=0.01,
+        required=False,
+        widget=forms.NumberInput(attrs={
+            'class': 'form-control',
+            'placeholder': 'Auto-bid up to (optional)',
+            'step': '0.01',
+            'min': '0.01'
+        })
+    )
+
+    def clean(self):
+        cleaned = super().clean()
+        amount = cleaned.get('amount')
+        max_amount = cleaned.get('max_amount')
+        if amount is None and max_amount is None:
+            raise forms.ValidationError("Enter a bid or a maximum bid.")
+        if amount is not None and max_amount is not None and max_amount < amount:
+            raise forms.ValidationError("Your maximum must be at least your bid.")
+        return cleaned
 
 
 class CommentForm(forms.ModelForm):
@@ -0,0 +1,111 @@
+"""
+Bid history for a listing without loading every bid.
+
+``bid_page`` returns bids newest first in keyset pages on Bid.id (ids grow in
+the order bids were accepted, since bids on a listing are serialised by its
+row lock, see auctions.bidding). ``price_series`` downsamples the price to at
+most MAX_POINTS buckets in SQL. A listing's visible bids only ever go up, so
+the highest amount in a bucket is also its last value. The series is cached
+under the listing's latest bid id (one index lookup), so a new bid makes every
+worker compute a fresh series, whether or not their cache is shared; bid
+saves/deletes also drop the entry after commit (see auctions.signals).
+"""
+
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Count, Max, Min
+from django.db.models.functions import Trunc
+
+from .models import Bid
+
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+MAX_POINTS = 120
+SERIES_TTL = 24 * 60 * 60
+
+# (Trunc kind, bucket width) from finest to coarsest
+GRANULARITIES = [
+    ("minute", timedelta(minutes=1)),
+    ("hour", timedelta(hours=1)),
+    ("day", timedelta(days=1)),
+    ("week", timedelta(weeks=1)),
+    ("month", timedelta(days=31)),
+]
+
+
+def series_cache_key(listing_id, latest_bid_id):
+    return f"bid-series:v2:{listing_id}:{latest_bid_id}"
+
+
+def _latest_bid_id(listing_id):
+    return (
+        Bid.objects.filter(listing_id=listing_id)
+        .order_by("-id")
+        .values_list("id", flat=True)
+        .first()
+    )
+
+
+def bid_page(listing_id, before=None, limit=PAGE_SIZE):
+    """
+    Up to ``limit`` bids older than bid id ``before`` (newest first).
+    Returns ``(bids, next_cursor)``; ``next_cursor`` is None on the last page.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    qs = Bid.objects.filter(listing_id=listing_id)
+    if before is not None:
+        qs = qs.filter(id__lt=before)
+    rows = list(
+        qs.order_by("-id").values("id", "amount", "timestamp", "bidder__username")[:limit + 1]
+    )
+    next_cursor = rows[limit - 1]["id"] if len(rows) > limit else None
+    bids = [
+        {
+            "id": row["id"],
+            "bidder": row["bidder__username"],
+            "amount": row["amount"],
+            "timestamp": row["timestamp"],
+        }
+        for row in rows[:limit]
+    ]
+    return bids, next_cursor
+
+
+def _compute_series(listing_id):
+    bids = Bid.objects.filter(listing_id=listing_id).order_by()
+    span = bids.aggregate(first=Min("timestamp"), last=Max("timestamp"))
+    if span["first"] is None:
+        return {"granularity": None, "points": []}
+    width = span["last"] - span["first"]
+    kind = next(
+        (kind for kind, step in GRANULARITIES if width / step < MAX_POINTS),
+        GRANULARITIES[-1][0],
+    )
+    rows = (
+        bids.annotate(bucket=Trunc("timestamp", kind))
+        .values("bucket")
+        .annotate(price=Max("amount"), bids=Count("id"))
+        .order_by("bucket")
+    )
+    return {
+        "granularity": kind,
+        "points": [
+            {"t": row["bucket"].isoformat(), "price": str(row["price"]), "bids": row["bids"]}
+            for row in rows
+        ],
+    }
+
+
+def price_series(listing_id):
+    key = series_cache_key(listing_id, _latest_bid_id(listing_id))
+    series = cache.get(key)
+    if series is None:
+        series = _compute_series(listing_id)
+        cache.set(key, series, SERIES_TTL)
+    return series
+
+
+def invalidate_series(listing_id):
+    # a deleted bid older than the latest one leaves the key unchanged
+    cache.delete(series_cache_key(listing_id, _latest_bid_id(listing_id)))
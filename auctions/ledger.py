@@ -0,0 +1,65 @@
+"""
+Writing to the append-only auction ledger (AuctionEvent) and keeping the
+per-user summaries it derives (UserAuctionStats) up to date.
+
+``record()`` must run inside the transaction that holds the listing's row
+lock (see auctions.bidding), which is what makes ``sequence`` monotonic.
+"""
+
+from django.db.models import F
+
+from .models import AuctionEvent, UserAuctionStats
+
+
+def _bump_stats(user_id, **deltas):
+    UserAuctionStats.objects.get_or_create(user_id=user_id)
+    UserAuctionStats.objects.filter(user_id=user_id).update(
+        **{field: F(field) + delta for field, delta in deltas.items()}
+    )
+
+
+def apply_event(stats, event):
+    """
+    Apply ``event`` to the in-memory per-user ``stats`` dict
+    (user_id -> {field: value}). Shared by record() and the replay.
+    """
+    if event.user_id is None:
+        return
+    entry = stats.setdefault(event.user_id, {"bids_placed": 0, "auctions_won": 0, "amount_won": 0})
+    if event.kind == AuctionEvent.BID_PLACED:
+        entry["bids_placed"] += 1
+    elif event.kind == AuctionEvent.WINNER_SET:
+        entry["auctions_won"] += 1
+        entry["amount_won"] += event.amount or 0
+    elif event.kind == AuctionEvent.LISTING_REOPENED:
+        entry["auctions_won"] -= 1
+        entry["amount_won"] -= event.amount or 0
+
+
+def record(listing, kind, user=None, amount=None, bid=None):
+    """Append one event for ``listing`` and update the derived user stats."""
+    last = (
+        AuctionEvent.objects.filter(listing_id=listing.pk)
+        .order_by("-sequence")
+        .values_list("sequence", flat=True)
+        .first()
+    )
+    event = AuctionEvent.objects.create(
+        listing_id=listing.pk,
+        sequence=(last or 0) + 1,
+        kind=kind,
+        user=user,
+        amount=amount,
+        bid_id=bid.pk if bid is not None else None,
+    )
+    stats = {}
+    apply_event(stats, event)
+    for user_id, fields in stats.items():
+        deltas = {field: value for field, value in fields.items() if value}
+        if deltas:
+            _bump_stats(user_id, **deltas)
+    return event
+
+
+def record_bid(bid):
+    return record(bid.listing, AuctionEvent.BID_PLACED, user=bid.bidder, amount=bid.amount, bid=bid)
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from auctions.archive import archivable, archive_batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Move listings closed for more than --days days (with their bids, "
+        "comments and notifications) into the ArchivedListing cold store."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=90)
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--max-batches", type=int, default=0, help="Stop after this many batches (0 = no limit)."
+        )
+        parser.add_argument(
+            "--pause", type=float, default=0.0, help="Seconds to sleep between batches."
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Only count archivable listings.")
+
+    def handle(self, *args, **options):
+        if options["dry_run"]:
+            count = archivable(options["days"]).count()
+            self.stdout.write(f"{count} listing(s) closed for more than {options['days']} days.")
+            return
+
+        total = batches = 0
+        while not options["max_batches"] or batches < options["max_batches"]:
+            archived = archive_batch(options["days"], options["batch_size"])
+            if not archived:
+                break
+            total += archived
+            batches += 1
+            self.stdout.write(f"batch {batches}: archived {archived} listing(s)")
+            if options["pause"]:
+                time.sleep(options["pause"])
+        self.stdout.write(self.style.SUCCESS(f"Archived {total} listing(s) in {batches} batch(es)."))
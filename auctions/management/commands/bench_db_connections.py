@@ -0,0 +1,68 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connections
+
+from commerce.postgresql.base import pool_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulate request cycles against a database alias, once opening a new "
+        "connection per request (CONN_MAX_AGE=0, no pool) and once with the "
+        "configured persistent/pooled connections, and compare p50/p95 latency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=100)
+        parser.add_argument("--database", default="default")
+        parser.add_argument("--query", default="SELECT 1")
+
+    def _run(self, conn, count, query):
+        timings = []
+        for _ in range(count):
+            start = time.perf_counter()
+            request_started.send(sender=self.__class__)
+            with conn.cursor() as cursor:
+                cursor.execute(query)
+                cursor.fetchall()
+            request_finished.send(sender=self.__class__)
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings
+
+    def _report(self, label, timings):
+        timings = sorted(timings)
+        p95 = timings[max(0, int(len(timings) * 0.95) - 1)]
+        self.stdout.write(
+            f"{label:<10} p50={statistics.median(timings):7.2f} ms  "
+            f"p95={p95:7.2f} ms  max={timings[-1]:7.2f} ms"
+        )
+        return p95
+
+    def handle(self, *args, **options):
+        conn = connections[options["database"]]
+        settings_dict = conn.settings_dict
+        original_age = settings_dict["CONN_MAX_AGE"]
+        original_pool = settings_dict["OPTIONS"].pop("pool", None)
+
+        conn.close()
+        settings_dict["CONN_MAX_AGE"] = 0
+        try:
+            cold = self._run(conn, options["requests"], options["query"])
+        finally:
+            conn.close()
+            settings_dict["CONN_MAX_AGE"] = original_age
+            if original_pool is not None:
+                settings_dict["OPTIONS"]["pool"] = original_pool
+
+        reused = self._run(conn, options["requests"], options["query"])
+
+        mode = "pool" if original_pool else f"CONN_MAX_AGE={original_age}"
+        self.stdout.write(f"{conn.vendor} / {mode}, {options['requests']} requests each")
+        cold_p95 = self._report("cold", cold)
+        warm_p95 = self._report("reused", reused)
+        self.stdout.write(f"connection setup removed from p95: {cold_p95 - warm_p95:.2f} ms")
+        for alias, stats in pool_stats().items():
+            self.stdout.write(f"{alias}: {stats}")
@@ -0,0 +1,196 @@
+import json
+import statistics
+import time
+import tracemalloc
+from contextlib import ExitStack
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Count, Q
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from auctions import urls
+from auctions.models import Bid, Category, Listing, User
+
+# routes that change state or end the session
+SKIP = {"logout"}
+
+
+class Command(BaseCommand):
+    help = (
+        "Request every route in auctions/urls.py through the test client and "
+        "report query count, wall time and peak memory as JSON. With --baseline, "
+        "compare against an earlier report."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=5, help="Timed runs per route.")
+        parser.add_argument("--username", help="Log in as this user (default: the busiest bidder).")
+        parser.add_argument("--anonymous", action="store_true", help="Do not log in.")
+        parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+        parser.add_argument("--baseline", help="Earlier report to compare against.")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.2,
+            help="Relative slow-down counted as a regression (default 0.2 = 20%%).",
+        )
+        parser.add_argument(
+            "--min-ms",
+            type=float,
+            default=5.0,
+            help="Ignore time differences smaller than this many milliseconds.",
+        )
+        parser.add_argument(
+            "--fail-on-regression", action="store_true", help="Exit with an error on regressions."
+        )
+
+    def sample_kwargs(self):
+        """Representative values for URL parameters: the busiest rows."""
+        listing = (
+            Listing.objects.filter(active=True).annotate(n=Count("bids")).order_by("-n").first()
+            or Listing.objects.first()
+        )
+        category = (
+            Category.objects.annotate(n=Count("listings", filter=Q(listings__active=True)))
+            .order_by("-n").first()
+        )
+        return {
+            "listing_id": listing.pk if listing else None,
+            "category_id": category.pk if category else None,
+        }
+
+    def bench_user(self, options):
+        if options["anonymous"]:
+            return None
+        if options["username"]:
+            return User.objects.get(username=options["username"])
+        busiest = (
+            Bid.objects.values("bidder").annotate(n=Count("id")).order_by("-n").first()
+        )
+        if busiest:
+            return User.objects.get(pk=busiest["bidder"])
+        return User.objects.order_by("pk").first()
+
+    def routes(self, sample):
+        for pattern in urls.urlpatterns:
+            name = pattern.name
+            if name in SKIP:
+                continue
+            params = list(pattern.pattern.converters)
+            if any(sample.get(param) is None for param in params):
+                yield name, None
+                continue
+            yield name, reverse(name, kwargs={param: sample[param] for param in params})
+
+    def fetch(self, client, path):
+        """GET ``path`` and read the whole body (streamed pages render lazily)."""
+        response = client.get(path)
+        if response.streaming:
+            b"".join(response.streaming_content)
+        return response
+
+    def measure(self, client, path, repeat):
+        self.fetch(client, path)  # warm-up: template compilation, caches
+        timings = []
+        for _ in range(repeat):
+            with ExitStack() as stack:
+                captured = [
+                    stack.enter_context(CaptureQueriesContext(connections[alias]))
+                    for alias in connections
+                ]
+                started = time.perf_counter()
+                response = self.fetch(client, path)
+                timings.append((time.perf_counter() - started) * 1000)
+            queries = sum(len(c.captured_queries) for c in captured)
+        # memory is measured separately: tracing slows the timed runs down
+        tracemalloc.start()
+        self.fetch(client, path)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return {
+            "path": path,
+            "status": response.status_code,
+            "queries": queries,
+            "time_ms": round(statistics.median(timings), 2),
+            "time_ms_max": round(max(timings), 2),
+            "peak_kib": round(peak / 1024, 1),
+        }
+
+    def compare(self, report, baseline, options):
+        regressions = []
+        for name, current in report["routes"].items():
+            before = baseline.get("routes", {}).get(name)
+            if not before or "time_ms" not in before or "time_ms" not in current:
+                continue
+            notes = []
+            if current["queries"] > before["queries"]:
+                notes.append(f"queries {before['queries']} -> {current['queries']}")
+            slower = current["time_ms"] - before["time_ms"]
+            if slower > options["min_ms"] and slower > before["time_ms"] * options["threshold"]:
+                notes.append(f"time {before['time_ms']}ms -> {current['time_ms']}ms")
+            line = (
+                f"{name:24} {before['time_ms']:>9.2f} -> {current['time_ms']:>9.2f} ms  "
+                f"{before['queries']:>4} -> {current['queries']:>4} queries"
+            )
+            if notes:
+                regressions.append(name)
+                self.stderr.write(self.style.ERROR(f"{line}  REGRESSION: {', '.join(notes)}"))
+            else:
+                self.stderr.write(line)
+        return regressions
+
+    def handle(self, *args, **options):
+        sample = self.sample_kwargs()
+        user = self.bench_user(options)
+        report = {
+            "meta": {
+                "created": timezone.now().isoformat(),
+                "database": connections["default"].vendor,
+                "user": user.username if user else None,
+                "repeat": options["repeat"],
+                "rows": {
+                    "users": User.objects.count(),
+                    "listings": Listing.objects.count(),
+                    "bids": Bid.objects.count(),
+                },
+            },
+            "routes": {},
+        }
+
+        # plain HTTP, unhashed static files: measure the views, not the deployment
+        with override_settings(
+            ALLOWED_HOSTS=["testserver"],
+            SECURE_SSL_REDIRECT=False,
+            STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage",
+        ):
+            client = Client()
+            if user is not None:
+                client.force_login(user)
+            for name, path in self.routes(sample):
+                if path is None:
+                    report["routes"][name] = {"skipped": "no sample data"}
+                    continue
+                report["routes"][name] = self.measure(client, path, options["repeat"])
+                self.stderr.write(
+                    f"{name:24} {report['routes'][name]['time_ms']:>9.2f} ms  "
+                    f"{report['routes'][name]['queries']:>4} queries"
+                )
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                fh.write(output + "\n")
+        else:
+            self.stdout.write(output)
+
+        if options["baseline"]:
+            with open(options["baseline"]) as fh:
+                baseline = json.load(fh)
+            self.stderr.write(f"\nCompared with {options['baseline']} ({baseline['meta']['created']}):")
+            regressions = self.compare(report, baseline, options)
+            if regressions and options["fail_on_regression"]:
+                raise CommandError(f"{len(regressions)} route(s) regressed: {', '.join(regressions)}")
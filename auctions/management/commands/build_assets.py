@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from auctions import assets
+
+
+class Command(BaseCommand):
+    help = "Vendor Bootstrap and build the CSS/JS bundles."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--refresh-vendor",
+            action="store_true",
+            help=f"Re-download Bootstrap {assets.BOOTSTRAP_VERSION} even if already vendored.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            for path in assets.vendor_bootstrap(force=options["refresh_vendor"]):
+                self.stdout.write(f"Vendored {path.name}")
+            sizes = assets.build_bundles(vendor=False)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Asset build failed: {exc}")
+        for name, size in sizes.items():
+            self.stdout.write(f"{name}: {size / 1024:.1f} KiB")
+        self.stdout.write(self.style.SUCCESS("Assets built."))
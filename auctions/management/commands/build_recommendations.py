@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from auctions.recommendations import MAX_USER_LISTINGS, TOP_K, compute, store
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the 'also watched / bid on' recommendations from Watchlist and "
+        "Bid co-occurrence. Run offline (e.g. nightly)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top-k", type=int, default=TOP_K)
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Users read per batch, and rows written per insert.",
+        )
+        parser.add_argument(
+            "--max-user-listings",
+            type=int,
+            default=MAX_USER_LISTINGS,
+            help="Ignore users engaged with more listings than this.",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Compute but write nothing.")
+
+    def handle(self, *args, **options):
+        result, stats = compute(
+            top_k=options["top_k"],
+            batch_size=options["batch_size"],
+            max_user_listings=options["max_user_listings"],
+        )
+        written = 0 if options["dry_run"] else store(result, batch_size=options["batch_size"])
+        prefix = "[dry run] " if options["dry_run"] else ""
+        self.stdout.write(
+            f"{prefix}{stats['users']} users ({stats['skipped_users']} skipped), "
+            f"recommendations for {stats['listings']} listings, {written} rows written."
+        )
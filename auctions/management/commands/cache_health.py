@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from auctions.cache import cache_health, warm_cache
+
+
+class Command(BaseCommand):
+    help = "Check every configured cache and optionally run the cache warm-up."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--warm", action="store_true", help="Run the registered cache warmers.")
+
+    def handle(self, *args, **options):
+        failed = False
+        for alias in settings.CACHES:
+            result = cache_health(alias)
+            line = f"{alias}: {result['backend']} {result['latency_ms']:.1f} ms"
+            if result["ok"]:
+                self.stdout.write(self.style.SUCCESS(f"{line} OK"))
+            else:
+                failed = True
+                self.stdout.write(self.style.ERROR(f"{line} FAILED {result['error'] or ''}"))
+        self.stdout.write(f"session engine: {settings.SESSION_ENGINE}")
+
+        if options["warm"]:
+            for name, seconds in warm_cache().items():
+                self.stdout.write(f"warmed {name} in {seconds * 1000:.1f} ms")
+
+        if failed:
+            raise CommandError("Cache health check failed.")
@@ -0,0 +1,33 @@
+from django.contrib.staticfiles.management.commands.collectstatic import (
+    Command as CollectStaticCommand,
+)
+
+from auctions import assets
+
+
+class Command(CollectStaticCommand):
+    """
+    collectstatic that builds the asset bundles first, so the manifest storage
+    fingerprints and compresses (gzip/brotli) the fresh bundles.
+    """
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--skip-assets",
+            action="store_true",
+            help="Do not rebuild the CSS/JS bundles before collecting.",
+        )
+
+    def handle(self, **options):
+        if not options["skip_assets"]:
+            try:
+                sizes = assets.build_bundles()
+            except (OSError, ValueError) as exc:
+                # Pages fall back to the CDN when the bundles are missing
+                self.stderr.write(f"Skipping asset bundles: {exc}")
+            else:
+                if options["verbosity"] >= 1:
+                    for name, size in sizes.items():
+                        self.stdout.write(f"Built {name} ({size / 1024:.1f} KiB)")
+        return super().handle(**options)
@@ -0,0 +1,91 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter; prints one JSON line of timings in ms.
+PROBE = r"""
+import json, os, sys, time
+t0 = time.perf_counter()
+import django
+from django.core.wsgi import get_wsgi_application
+t1 = time.perf_counter()
+application = get_wsgi_application()
+t2 = time.perf_counter()
+result = {"import_ms": (t1 - t0) * 1000, "setup_ms": (t2 - t1) * 1000}
+if os.environ["COLD_START_WARM"] == "1":
+    from auctions.warmup import warm_up
+    result["warm_up_ms"] = {k: v * 1000 for k, v in warm_up().items()}
+from django.test import Client
+client = Client(raise_request_exception=False)
+host = os.environ["COLD_START_HOST"]
+path = os.environ["COLD_START_PATH"]
+for label in ("first_request", "second_request"):
+    start = time.perf_counter()
+    response = client.get(path, HTTP_HOST=host, secure=True)
+    result[label + "_ms"] = (time.perf_counter() - start) * 1000
+    result["status"] = response.status_code
+print(json.dumps(result))
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure cold-start latency in fresh interpreters: importing Django, "
+        "setting up the app, the optional warm-up and the first and second "
+        "request to --path. Prints the median of --runs runs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/")
+        parser.add_argument("--runs", type=int, default=3)
+        parser.add_argument(
+            "--warm", action="store_true", help="Run auctions.warmup before the first request."
+        )
+        parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+
+    def probe(self, options):
+        env = dict(
+            os.environ,
+            DJANGO_SETTINGS_MODULE=os.environ.get("DJANGO_SETTINGS_MODULE", "commerce.settings"),
+            COLD_START_WARM="1" if options["warm"] else "0",
+            COLD_START_HOST=(settings.ALLOWED_HOSTS or ["localhost"])[0],
+            COLD_START_PATH=options["path"],
+        )
+        proc = subprocess.run(
+            [sys.executable, "-c", PROBE],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if proc.returncode != 0:
+            raise CommandError(f"probe failed:\n{proc.stderr}")
+        return json.loads(proc.stdout.strip().splitlines()[-1])
+
+    def handle(self, *args, **options):
+        runs = [self.probe(options) for _ in range(options["runs"])]
+        report = {"path": options["path"], "runs": len(runs), "warm": options["warm"]}
+        for key in ("import_ms", "setup_ms", "first_request_ms", "second_request_ms"):
+            report[key] = round(statistics.median(run[key] for run in runs), 1)
+        if options["warm"]:
+            report["warm_up_ms"] = {
+                step: round(statistics.median(run["warm_up_ms"][step] for run in runs), 1)
+                for step in runs[0]["warm_up_ms"]
+            }
+        report["status"] = runs[-1]["status"]
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        self.stdout.write(f"{report['path']} (median of {report['runs']} runs, status {report['status']})")
+        self.stdout.write(f"  import django        {report['import_ms']:>8.1f} ms")
+        self.stdout.write(f"  app setup            {report['setup_ms']:>8.1f} ms")
+        for step, ms in report.get("warm_up_ms", {}).items():
+            self.stdout.write(f"  warm-up {step:<12} {ms:>8.1f} ms")
+        self.stdout.write(f"  first request        {report['first_request_ms']:>8.1f} ms")
+        self.stdout.write(f"  second request       {report['second_request_ms']:>8.1f} ms")
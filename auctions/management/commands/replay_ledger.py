@@ -0,0 +1,117 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max, Q
+
+from auctions.directory import invalidate_directory
+from auctions.ledger import apply_event
+from auctions.models import AuctionEvent, Bid, Listing, UserAuctionStats
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild derived auction state from the AuctionEvent ledger: listing "
+        "active/winner, UserAuctionStats and the category directory cache. "
+        "Current prices (from Bid rows) are verified against the ledger."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report differences, write nothing.",
+        )
+
+    def _events(self, batch_size):
+        """Stream events in (listing, sequence) order using keyset pagination."""
+        last_listing, last_sequence = 0, 0
+        while True:
+            batch = list(
+                AuctionEvent.objects.filter(
+                    Q(listing_id__gt=last_listing)
+                    | Q(listing_id=last_listing, sequence__gt=last_sequence)
+                )
+                .order_by("listing_id", "sequence")
+                .only("listing_id", "sequence", "kind", "user_id", "amount")[:batch_size]
+            )
+            if not batch:
+                return
+            yield batch
+            last_listing, last_sequence = batch[-1].listing_id, batch[-1].sequence
+
+    def _flush(self, states, dry_run):
+        """Compare replayed listing states with the rows and fix differences."""
+        listings = Listing.objects.in_bulk(list(states))
+        prices = dict(
+            Bid.objects.filter(listing_id__in=states)
+            .values("listing_id")
+            .annotate(top=Max("amount"))
+            .order_by()
+            .values_list("listing_id", "top")
+        )
+        changed = []
+        for listing_id, state in states.items():
+            listing = listings.get(listing_id)
+            if listing is None:
+                continue  # deleted/archived; the ledger keeps its history
+            if prices.get(listing_id) != state["price"]:
+                self.price_mismatches += 1
+            if listing.active != state["active"] or listing.winner_id != state["winner"]:
+                listing.active = state["active"]
+                listing.winner_id = state["winner"]
+                changed.append(listing)
+        if changed and not dry_run:
+            Listing.objects.bulk_update(changed, ["active", "winner"])
+        self.listings_fixed += len(changed)
+        self.listings_seen += len(states)
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        self.listings_seen = self.listings_fixed = self.price_mismatches = 0
+        user_stats = {}
+        states = {}
+        events = 0
+
+        for batch in self._events(options["batch_size"]):
+            for event in batch:
+                events += 1
+                state = states.setdefault(
+                    event.listing_id, {"price": None, "active": True, "winner": None}
+                )
+                if event.kind == AuctionEvent.BID_PLACED:
+                    if state["price"] is None or event.amount > state["price"]:
+                        state["price"] = event.amount
+                elif event.kind == AuctionEvent.LISTING_CLOSED:
+                    state["active"] = False
+                elif event.kind == AuctionEvent.WINNER_SET:
+                    state["winner"] = event.user_id
+                elif event.kind == AuctionEvent.LISTING_REOPENED:
+                    state["active"] = True
+                    state["winner"] = None
+                apply_event(user_stats, event)
+            # keep the listing still in progress (it may continue in the next batch)
+            current = batch[-1].listing_id
+            done = {pk: s for pk, s in states.items() if pk != current}
+            if done:
+                self._flush(done, dry_run)
+                states = {current: states[current]}
+        if states:
+            self._flush(states, dry_run)
+
+        stats_rows = [
+            UserAuctionStats(user_id=user_id, **fields)
+            for user_id, fields in user_stats.items()
+        ]
+        if not dry_run:
+            with transaction.atomic():
+                UserAuctionStats.objects.all().delete()
+                UserAuctionStats.objects.bulk_create(stats_rows, batch_size=options["batch_size"])
+            invalidate_directory()
+
+        prefix = "[dry run] " if dry_run else ""
+        self.stdout.write(
+            f"{prefix}Replayed {events} events for {self.listings_seen} listings: "
+            f"{self.listings_fixed} listing(s) {'would be ' if dry_run else ''}corrected, "
+            f"{len(stats_rows)} user summaries rebuilt, "
+            f"{self.price_mismatches} price mismatch(es) between ledger and bids."
+        )
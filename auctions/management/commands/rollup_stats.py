@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from auctions.rollups import roll_up_bids, sample_watchers
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold bids placed since the last run into the hourly seller rollups and "
+        "record current watcher counts. Run periodically (e.g. every few minutes)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--lag",
+            type=int,
+            default=30,
+            help="Leave bids younger than this many seconds for the next run.",
+        )
+        parser.add_argument(
+            "--max-batches",
+            type=int,
+            default=0,
+            help="Stop after this many batches (0 = until caught up).",
+        )
+        parser.add_argument(
+            "--loop",
+            type=int,
+            default=0,
+            metavar="SECONDS",
+            help="Keep running, sleeping this many seconds between passes.",
+        )
+
+    def _pass(self, options):
+        bids = batches = 0
+        while True:
+            done = roll_up_bids(batch_size=options["batch_size"], lag=options["lag"])
+            if not done:
+                break
+            bids += done
+            batches += 1
+            if options["max_batches"] and batches >= options["max_batches"]:
+                break
+        listings = sample_watchers()
+        self.stdout.write(
+            f"Rolled up {bids} bid(s) in {batches} batch(es); "
+            f"watcher counts sampled for {listings} listing(s)."
+        )
+
+    def handle(self, *args, **options):
+        self._pass(options)
+        while options["loop"]:
+            time.sleep(options["loop"])
+            self._pass(options)
@@ -0,0 +1,201 @@
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from auctions.models import (
+    AuctionEvent, Bid, Category, Comment, Listing, Notification, User, Watchlist,
+)
+
+WORDS = (
+    "vintage rare antique signed mint boxed retro classic limited handmade "
+    "leather silver brass oak walnut ceramic vinyl camera watch lamp chair "
+    "guitar print poster bicycle jacket clock radio mirror vase rug desk"
+).split()
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate production-like volumes of users, categories, listings, bids, "
+        "comments, watchlists and notifications with bulk inserts. Bid counts "
+        "per listing are heavy-tailed and bids bunch up towards the close. "
+        "Use a scratch database: nothing is cleaned up."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=2000)
+        parser.add_argument("--categories", type=int, default=25)
+        parser.add_argument("--listings", type=int, default=10000)
+        parser.add_argument("--bids", type=float, default=15, help="Mean bids per listing.")
+        parser.add_argument("--comments", type=float, default=2, help="Mean comments per listing.")
+        parser.add_argument("--watchers", type=float, default=3, help="Mean watchers per listing.")
+        parser.add_argument(
+            "--closed", type=float, default=0.3, help="Fraction of listings that are closed."
+        )
+        parser.add_argument("--days", type=int, default=60, help="Spread listings over this many days.")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Listings per transaction.")
+        parser.add_argument("--seed", type=int, default=None, help="Random seed (repeatable runs).")
+        parser.add_argument(
+            "--no-replay",
+            action="store_true",
+            help="Skip rebuilding winners/user stats from the ledger afterwards.",
+        )
+
+    def heavy_tail(self, mean, cap=50):
+        """Pareto-distributed count with the given mean (many small, a few huge)."""
+        if mean <= 0:
+            return 0
+        # paretovariate(1.5) - 1 has mean 2
+        return min(int((self.rng.paretovariate(1.5) - 1) * mean / 2), int(mean * cap))
+
+    def pick_user(self):
+        # skewed: a small share of users does most of the bidding
+        return self.user_ids[int(len(self.user_ids) * self.rng.random() ** 3)]
+
+    def create_users(self, count):
+        password = make_password("seed-password")
+        tag = int(time.time())
+        users = [
+            User(username=f"seed{tag}_{i}", email=f"seed{tag}_{i}@example.com", password=password)
+            for i in range(count)
+        ]
+        User.objects.bulk_create(users, batch_size=1000)
+        return list(
+            User.objects.filter(username__startswith=f"seed{tag}_").values_list("id", flat=True)
+        )
+
+    def create_categories(self, count):
+        existing = set(Category.objects.values_list("name", flat=True))
+        names = [f"Category {i}" for i in range(1, count + 1) if f"Category {i}" not in existing]
+        Category.objects.bulk_create([Category(name=name) for name in names])
+        return list(Category.objects.values_list("id", flat=True))
+
+    def seed_batch(self, size, options, now):
+        rng = self.rng
+        horizon = timedelta(days=options["days"])
+        listings = []
+        for _ in range(size):
+            created = now - horizon * rng.random()
+            listings.append(Listing(
+                title=" ".join(rng.sample(WORDS, 3)).title(),
+                description=" ".join(rng.choices(WORDS, k=rng.randint(10, 60))),
+                starting_bid=Decimal(rng.choice([1, 5, 10, 20, 50, 100, 250])),
+                category_id=rng.choice(self.category_ids) if rng.random() < 0.9 else None,
+                owner_id=self.pick_user(),
+                created_at=created,
+            ))
+        Listing.objects.bulk_create(listings)
+
+        bids, events, comments, watches, notifications = [], [], [], [], []
+        closing = []
+        for listing in listings:
+            life = now - listing.created_at
+            count = self.heavy_tail(options["bids"])
+            # 1 - u**3 pushes timestamps towards the end of the listing's life
+            offsets = sorted(life * (1 - rng.random() ** 3) for _ in range(count))
+            rivals = [self.pick_user() for _ in range(rng.randint(2, 5))]
+            rivals = [user for user in rivals if user != listing.owner_id] or [self.user_ids[0]]
+            amount = listing.starting_bid
+            step = max(1, listing.starting_bid // 20)
+            listing_bids = []
+            for i, offset in enumerate(offsets):
+                if i:
+                    amount += step * rng.choice([1, 1, 2, 5, 10])
+                listing_bids.append(Bid(
+                    listing=listing,
+                    bidder_id=rivals[i % len(rivals)],
+                    amount=amount,
+                    timestamp=listing.created_at + offset,
+                ))
+            bids.extend(listing_bids)
+            if rng.random() < options["closed"]:
+                closing.append((listing, listing_bids[-1] if listing_bids else None))
+
+            for _ in range(self.heavy_tail(options["comments"], cap=20)):
+                comments.append(Comment(
+                    listing=listing,
+                    commenter_id=self.pick_user(),
+                    content=" ".join(rng.choices(WORDS, k=rng.randint(3, 30))),
+                    timestamp=listing.created_at + life * rng.random(),
+                ))
+            watchers = {self.pick_user() for _ in range(self.heavy_tail(options["watchers"], cap=100))}
+            watches.extend(
+                Watchlist(user_id=user, listing=listing, added_at=listing.created_at + life * rng.random())
+                for user in watchers
+            )
+
+        Bid.objects.bulk_create(bids, batch_size=2000)
+        Comment.objects.bulk_create(comments, batch_size=2000)
+        Watchlist.objects.bulk_create(watches, batch_size=2000)
+
+        sequences = {}
+        for bid in bids:
+            sequences[bid.listing_id] = sequences.get(bid.listing_id, 0) + 1
+            events.append(AuctionEvent(
+                listing_id=bid.listing_id, sequence=sequences[bid.listing_id],
+                kind=AuctionEvent.BID_PLACED, user_id=bid.bidder_id, amount=bid.amount,
+                bid_id=bid.pk, created_at=bid.timestamp,
+            ))
+        closed = []
+        for listing, top in closing:
+            listing.active = False
+            listing.closed_at = min(now, (top.timestamp if top else listing.created_at) + timedelta(minutes=1))
+            listing.winner_id = top.bidder_id if top else None
+            closed.append(listing)
+            sequence = sequences.get(listing.pk, 0) + 1
+            events.append(AuctionEvent(
+                listing_id=listing.pk, sequence=sequence, kind=AuctionEvent.LISTING_CLOSED,
+                amount=top.amount if top else None, created_at=listing.closed_at,
+            ))
+            if top is not None:
+                events.append(AuctionEvent(
+                    listing_id=listing.pk, sequence=sequence + 1, kind=AuctionEvent.WINNER_SET,
+                    user_id=top.bidder_id, amount=top.amount, created_at=listing.closed_at,
+                ))
+                notifications.append(Notification(
+                    recipient_id=top.bidder_id, title="You won an auction",
+                    message=f"You won '{listing.title}' for ${top.amount}.",
+                    listing=listing, url=f"/listing/{listing.pk}",
+                    read=rng.random() < 0.7, created_at=listing.closed_at,
+                ))
+        Listing.objects.bulk_update(closed, ["active", "closed_at", "winner"], batch_size=1000)
+        AuctionEvent.objects.bulk_create(events, batch_size=2000)
+        Notification.objects.bulk_create(notifications, batch_size=2000)
+        return {
+            "listings": len(listings), "bids": len(bids), "comments": len(comments),
+            "watchlist": len(watches), "notifications": len(notifications), "events": len(events),
+        }
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        started = time.perf_counter()
+        now = timezone.now()
+
+        self.user_ids = self.create_users(options["users"])
+        self.rng.shuffle(self.user_ids)
+        self.category_ids = self.create_categories(options["categories"])
+        self.stdout.write(f"{len(self.user_ids)} users, {len(self.category_ids)} categories")
+
+        totals = {}
+        remaining = options["listings"]
+        while remaining > 0:
+            size = min(options["batch_size"], remaining)
+            with transaction.atomic():
+                counts = self.seed_batch(size, options, now)
+            for key, value in counts.items():
+                totals[key] = totals.get(key, 0) + value
+            remaining -= size
+            self.stdout.write(f"  {totals['listings']}/{options['listings']} listings")
+
+        if not options["no_replay"]:
+            call_command("replay_ledger", stdout=self.stdout)
+        summary = ", ".join(f"{value} {key}" for key, value in totals.items())
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {summary} in {time.perf_counter() - started:.1f}s."
+        ))
@@ -0,0 +1,171 @@
+import secrets
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DatabaseError, connections
+from django.middleware import gzip
+from django.urls import Resolver404, resolve
+from django.utils.cache import patch_vary_headers
+
+from . import profiling, slowlog, streaming
+from .routers import replica_configured, use_replica
+
+# View names whose GET requests may be answered from the read replica.
+# listing_price_series is left out: it is cached until the next bid, and a
+# lagging replica could put a stale series into the cache.
+REPLICA_VIEWS = {
+    "index", "categories", "category_listings", "listing", "listing_bids", "listing_comments",
+}
+
+PRIMARY_PIN_COOKIE = "pin_primary"
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Serve GETs of read-only views from the replica, except for clients that
+    wrote something in the last REPLICA_STICKY_SECONDS (read-your-writes):
+    a request that wrote to the primary sets a short-lived cookie that pins
+    its client's reads to the primary, so a user's own bid/comment is always
+    visible on redirect.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.method in ("GET", "HEAD", "OPTIONS", "TRACE"):
+            if (
+                request.method in ("GET", "HEAD")
+                and replica_configured()
+                and self._replica_view(request)
+                and not self._pinned(request)
+            ):
+                # The whole rest of the chain (other middleware, rendering of
+                # template responses) reads from the replica
+                with use_replica():
+                    return self.get_response(request)
+            return self.get_response(request)
+
+        wrote = False
+
+        def track_writes(execute, sql, params, many, context):
+            nonlocal wrote
+            result = execute(sql, params, many, context)
+            wrote = wrote or sql.lstrip()[:6].upper() in ("INSERT", "UPDATE", "DELETE")
+            return result
+
+        with connections["default"].execute_wrapper(track_writes):
+            response = self.get_response(request)
+        if wrote:
+            sticky = settings.REPLICA_STICKY_SECONDS
+            response.set_cookie(
+                PRIMARY_PIN_COOKIE,
+                str(time.time() + sticky),
+                max_age=sticky,
+                httponly=True,
+                samesite="Lax",
+                secure=request.is_secure(),
+            )
+        return response
+
+    def _pinned(self, request):
+        try:
+            return float(request.COOKIES.get(PRIMARY_PIN_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def _replica_view(self, request):
+        # request.resolver_match is only set once the handler resolves the
+        # URL, inside get_response
+        try:
+            match = resolve(request.path_info, getattr(request, "urlconf", None))
+        except Resolver404:
+            return False
+        if match.namespace == "admin":
+            return match.url_name.endswith("_changelist")
+        return match.url_name in REPLICA_VIEWS
+
+
+class ProfilingMiddleware:
+    """
+    Profile selected requests, see auctions.profiling. Must come after
+    AuthenticationMiddleware; removed at startup unless PROFILING_ENABLED.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        profiling.install_template_hook()
+
+    def __call__(self, request):
+        reason = profiling.trigger(request)
+        if reason is None:
+            return self.get_response(request)
+        return profiling.profile_request(self.get_response, request, reason)
+
+
+class SlowQueryMiddleware:
+    """
+    Log and aggregate queries slower than SLOW_QUERY_MS, see auctions.slowlog.
+    Removed at startup when SLOW_QUERY_MS is 0.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SLOW_QUERY_MS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        collector = slowlog.SlowQueryCollector(settings.SLOW_QUERY_MS)
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(collector.wrapper(alias)))
+            response = self.get_response(request)
+        if collector.slow:
+            match = request.resolver_match
+            try:
+                sampled = slowlog.record(collector.slow, match.view_name if match else request.path)
+            except DatabaseError:
+                slowlog.logger.exception("could not record slow queries")
+            else:
+                if sampled:
+                    # EXPLAIN ANALYZE runs the slow query again: do it when the
+                    # server closes the response, after the client has it (and
+                    # before request_finished closes the connection)
+                    response._resource_closers.append(lambda: self._explain(sampled))
+        return response
+
+    def _explain(self, sampled):
+        try:
+            slowlog.explain_sampled(sampled)
+        except DatabaseError:
+            slowlog.logger.exception("could not explain slow queries")
+
+
+class GZipMiddleware(gzip.GZipMiddleware):
+    """
+    Django's GZipMiddleware, except that streamed responses are compressed
+    with auctions.streaming.compress_sequence, which flushes every chunk: the
+    stock one holds the start of a streamed page back in zlib's buffer.
+    """
+
+    def process_response(self, request, response):
+        if not response.streaming or response.is_async or response.has_header("Content-Encoding"):
+            return super().process_response(request, response)
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if not gzip.re_accepts_gzip.search(request.META.get("HTTP_ACCEPT_ENCODING", "")):
+            return response
+        response.streaming_content = streaming.compress_sequence(
+            response.streaming_content,
+            # random-length gzip header against BREACH, as Django does
+            filename=b"a" * secrets.randbelow(self.max_random_bytes),
+        )
+        del response.headers["Content-Length"]
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = "gzip"
+        return response
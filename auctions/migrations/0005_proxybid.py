@@ -0,0 +1,31 @@
+# Generated by Django 4.2.16 on 2026-10-19 08:32
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0004_notification'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProxyBid',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('max_amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('placed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('bidder', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='proxy_bids', to=settings.AUTH_USER_MODEL)),
+                ('listing', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='proxy_bids', to='auctions.listing')),
+            ],
+            options={
+                'ordering': ['-max_amount', 'placed_at'],
+                'indexes': [models.Index(fields=['listing', '-max_amount'], name='auctions_pr_listing_3ee382_idx')],
+                'unique_together': {('listing', 'bidder')},
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.16 on 2026-10-19 08:34
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0005_proxybid'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserAuctionStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='auction_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('bids_placed', models.PositiveIntegerField(default=0)),
+                ('auctions_won', models.PositiveIntegerField(default=0)),
+                ('amount_won', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AuctionEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sequence', models.PositiveIntegerField()),
+                ('kind', models.CharField(choices=[('bid_placed', 'Bid placed'), ('listing_closed', 'Listing closed'), ('listing_reopened', 'Listing reopened'), ('winner_set', 'Winner set')], max_length=20)),
+                ('amount', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('bid_id', models.BigIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('listing', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='events', to='auctions.listing')),
+                ('user', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['listing', 'sequence'],
+                'unique_together': {('listing', 'sequence')},
+            },
+        ),
+    ]
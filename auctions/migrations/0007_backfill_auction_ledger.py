@@ -0,0 +1,73 @@
+from django.db import migrations
+from django.utils import timezone
+
+BATCH_SIZE = 500
+
+
+def backfill(apps, schema_editor):
+    """Seed the ledger from the bids and closed listings that predate it."""
+    Listing = apps.get_model("auctions", "Listing")
+    Bid = apps.get_model("auctions", "Bid")
+    AuctionEvent = apps.get_model("auctions", "AuctionEvent")
+    UserAuctionStats = apps.get_model("auctions", "UserAuctionStats")
+
+    stats = {}
+    pending = []
+    now = timezone.now()
+
+    def user_stats(user_id):
+        return stats.setdefault(user_id, {"bids_placed": 0, "auctions_won": 0, "amount_won": 0})
+
+    for listing in Listing.objects.order_by("id").iterator(chunk_size=BATCH_SIZE):
+        sequence = 0
+        top_amount = None
+        bids = Bid.objects.filter(listing_id=listing.id).order_by("timestamp", "id")
+        for bid in bids.iterator(chunk_size=BATCH_SIZE):
+            sequence += 1
+            pending.append(AuctionEvent(
+                listing_id=listing.id, sequence=sequence, kind="bid_placed",
+                user_id=bid.bidder_id, amount=bid.amount, bid_id=bid.id,
+                created_at=bid.timestamp,
+            ))
+            user_stats(bid.bidder_id)["bids_placed"] += 1
+            top_amount = bid.amount if top_amount is None else max(top_amount, bid.amount)
+        if not listing.active:
+            sequence += 1
+            pending.append(AuctionEvent(
+                listing_id=listing.id, sequence=sequence, kind="listing_closed",
+                amount=top_amount, created_at=now,
+            ))
+            if listing.winner_id:
+                sequence += 1
+                pending.append(AuctionEvent(
+                    listing_id=listing.id, sequence=sequence, kind="winner_set",
+                    user_id=listing.winner_id, amount=top_amount, created_at=now,
+                ))
+                entry = user_stats(listing.winner_id)
+                entry["auctions_won"] += 1
+                entry["amount_won"] += top_amount or 0
+        if len(pending) >= BATCH_SIZE:
+            AuctionEvent.objects.bulk_create(pending)
+            pending = []
+    AuctionEvent.objects.bulk_create(pending)
+
+    UserAuctionStats.objects.bulk_create(
+        [UserAuctionStats(user_id=user_id, **fields) for user_id, fields in stats.items()],
+        batch_size=BATCH_SIZE,
+    )
+
+
+def clear(apps, schema_editor):
+    apps.get_model("auctions", "AuctionEvent").objects.all().delete()
+    apps.get_model("auctions", "UserAuctionStats").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0006_auction_ledger'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, clear),
+    ]
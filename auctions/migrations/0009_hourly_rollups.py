@@ -0,0 +1,38 @@
+# Generated by Django 4.2.16 on 2026-10-19 08:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0008_listing_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupState',
+            fields=[
+                ('name', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('high_water', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ListingHourlyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('bids', models.PositiveIntegerField(default=0)),
+                ('high', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('watchers', models.PositiveIntegerField(blank=True, null=True)),
+                ('listing', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hourly_stats', to='auctions.listing')),
+            ],
+            options={
+                'ordering': ['listing', 'hour'],
+                'unique_together': {('listing', 'hour')},
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-19 08:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0009_hourly_rollups'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bid',
+            index=models.Index(fields=['listing', '-id'], name='auctions_bi_listing_2dc3b3_idx'),
+        ),
+    ]
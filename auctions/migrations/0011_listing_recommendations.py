@@ -0,0 +1,28 @@
+# Generated by Django 4.2.16 on 2026-10-19 08:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0010_bid_listing_id_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ListingRecommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('listing', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommendations', to='auctions.listing')),
+                ('recommended', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommended_in', to='auctions.listing')),
+            ],
+            options={
+                'ordering': ['listing', 'rank'],
+                'unique_together': {('listing', 'rank')},
+            },
+        ),
+    ]
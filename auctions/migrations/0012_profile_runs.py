@@ -0,0 +1,40 @@
+# Generated by Django 4.2.16 on 2026-10-19 08:45
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0011_listing_recommendations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfileRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('method', models.CharField(max_length=10)),
+                ('path', models.CharField(max_length=500)),
+                ('view_name', models.CharField(blank=True, max_length=200)),
+                ('trigger', models.CharField(max_length=10)),
+                ('status_code', models.PositiveSmallIntegerField()),
+                ('total_ms', models.FloatField()),
+                ('sql_count', models.PositiveIntegerField()),
+                ('sql_ms', models.FloatField()),
+                ('template_ms', models.FloatField()),
+                ('queries', models.JSONField(default=list)),
+                ('templates', models.JSONField(default=list)),
+                ('profile', models.BinaryField()),
+                ('summary', models.TextField(blank=True)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.16 on 2026-10-19 08:47
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0012_profile_runs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQueryStat',
+            fields=[
+                ('fingerprint', models.CharField(max_length=40, primary_key=True, serialize=False)),
+                ('pattern', models.TextField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('total_ms', models.FloatField(default=0)),
+                ('max_ms', models.FloatField(default=0)),
+                ('first_seen', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_seen', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_view', models.CharField(blank=True, max_length=200)),
+                ('last_frame', models.CharField(blank=True, max_length=300)),
+                ('explain', models.TextField(blank=True)),
+                ('explained_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-total_ms'],
+            },
+        ),
+    ]
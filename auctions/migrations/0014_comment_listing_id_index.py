@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-19 08:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0013_slow_query_stats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['listing', '-id'], name='auctions_co_listing_89f83d_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.16 on 2026-10-19 09:04
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0014_comment_listing_id_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='listinghourlystats',
+            name='listing',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='hourly_stats', to='auctions.listing'),
+        ),
+    ]
@@ -1,5 +1,10 @@
+import json
+import zlib
+
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
 class User(AbstractUser):
@@ -11,6 +16,16 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+class ListingQuerySet(models.QuerySet):
+    def with_prices(self):
+        """
+        Annotate ``price`` (highest bid, or the starting bid when there are no
+        bids) so templates don't run one query per card.
+        """
+        top_bid = Bid.objects.filter(listing=OuterRef("pk")).order_by("-amount").values("amount")[:1]
+        return self.annotate(price=Coalesce(Subquery(top_bid), "starting_bid"))
+
+
 class Listing(models.Model):
     title = models.CharField(max_length=128)
     description = models.TextField()
@@ -38,8 +53,18 @@ class Listing(models.Model):
         related_name='won_listings'
     )
     created_at = models.DateTimeField(default=timezone.now)
+    # set by auctions.bidding.close_listing, cleared on reopen
+    closed_at = models.DateTimeField(null=True, blank=True)
+
+    objects = ListingQuerySet.as_manager()
+
+    class Meta:
+        indexes = [models.Index(fields=['active', 'closed_at'])]
 
     def current_price(self):
+        if hasattr(self, "price"):
+            # annotated by ListingQuerySet.with_prices()
+            return self.price
         highest = self.bids.order_by('-amount').first()
         return highest.amount if highest else self.starting_bid
 
@@ -66,10 +91,38 @@ class Bid(models.Model):
 
     class Meta:
         ordering = ['-amount', '-timestamp']
+        indexes = [models.Index(fields=['listing', '-id'])]
 
     def __str__(self):
         return f"{self.amount} by {self.bidder} on {self.listing}"
 
+class ProxyBid(models.Model):
+    """
+    A bidder's hidden maximum for a listing. The bidding engine
+    (auctions.bidding) places visible bids on the bidder's behalf up to it.
+    """
+    listing = models.ForeignKey(
+        Listing,
+        on_delete=models.CASCADE,
+        related_name="proxy_bids"
+    )
+    bidder = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="proxy_bids"
+    )
+    max_amount = models.DecimalField(max_digits=10, decimal_places=2)
+    # when this maximum was set; on equal maxima the earlier one wins
+    placed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = ('listing', 'bidder')
+        ordering = ['-max_amount', 'placed_at']
+        indexes = [models.Index(fields=['listing', '-max_amount'])]
+
+    def __str__(self):
+        return f"{self.bidder} max {self.max_amount} on listing {self.listing_id}"
+
 class Comment(models.Model):
     listing = models.ForeignKey(
         Listing,
@@ -86,6 +139,7 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ['timestamp']
+        indexes = [models.Index(fields=['listing', '-id'])]
 
     def __str__(self):
         return f"Comment by {self.commenter} on {self.listing}"
@@ -138,3 +192,241 @@ class Notification(models.Model):
     def __str__(self):
         return f"Notification to {self.recipient.username}: {self.title}"
 
+
+class AuctionEvent(models.Model):
+    """
+    Append-only auction ledger, written in the same transaction as the change
+    it records. ``sequence`` is gap-free and increasing per listing (assigned
+    under the listing's row lock). Derived state (winners, UserAuctionStats)
+    can be rebuilt from it with ``manage.py replay_ledger``.
+
+    Foreign keys are not enforced so the log outlives the rows it references.
+    """
+    BID_PLACED = "bid_placed"
+    LISTING_CLOSED = "listing_closed"
+    LISTING_REOPENED = "listing_reopened"
+    WINNER_SET = "winner_set"
+    KIND_CHOICES = [
+        (BID_PLACED, "Bid placed"),
+        (LISTING_CLOSED, "Listing closed"),
+        (LISTING_REOPENED, "Listing reopened"),
+        (WINNER_SET, "Winner set"),
+    ]
+
+    listing = models.ForeignKey(
+        Listing,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="events"
+    )
+    sequence = models.PositiveIntegerField()
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    # bidder for bid_placed, winner for winner_set, cleared winner for listing_reopened
+    user = models.ForeignKey(
+        User,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        blank=True,
+        related_name="+"
+    )
+    amount = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    bid_id = models.BigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = ('listing', 'sequence')
+        ordering = ['listing', 'sequence']
+
+    def save(self, *args, **kwargs):
+        if self.pk is not None:
+            raise ValueError("AuctionEvent rows are append-only.")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError("AuctionEvent rows are append-only.")
+
+    def __str__(self):
+        return f"#{self.sequence} {self.kind} on listing {self.listing_id}"
+
+
+class UserAuctionStats(models.Model):
+    """Per-user summary derived from the AuctionEvent ledger."""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="auction_stats"
+    )
+    bids_placed = models.PositiveIntegerField(default=0)
+    auctions_won = models.PositiveIntegerField(default=0)
+    amount_won = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    def __str__(self):
+        return f"Stats for {self.user}"
+
+
+class ArchivedListing(models.Model):
+    """
+    Cold storage for a closed listing moved out of the hot tables by
+    ``manage.py archive_listings``. Keeps the columns needed to list/find it
+    and a zlib-compressed JSON document with the listing, its bids, comments
+    and notifications. The id is the original Listing id.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=128)
+    owner = models.ForeignKey(
+        User,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+"
+    )
+    winner = models.ForeignKey(
+        User,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        blank=True,
+        related_name="+"
+    )
+    final_price = models.DecimalField(max_digits=10, decimal_places=2)
+    created_at = models.DateTimeField()
+    closed_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(default=timezone.now)
+    payload = models.BinaryField()
+
+    def document(self):
+        return json.loads(zlib.decompress(bytes(self.payload)))
+
+    def __str__(self):
+        return f"{self.title} (archived)"
+
+
+class ListingHourlyStats(models.Model):
+    """
+    Hourly rollup of a listing's activity for the seller dashboard, filled
+    incrementally by ``manage.py rollup_stats``. Dashboards read only these
+    rows, so their cost grows with the number of buckets, not of bids.
+
+    Not tied to the Listing row: the history outlives the listing when
+    ``archive_listings`` moves it to ArchivedListing (same id).
+    """
+    listing = models.ForeignKey(
+        Listing,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="hourly_stats"
+    )
+    hour = models.DateTimeField()
+    bids = models.PositiveIntegerField(default=0)
+    # highest bid placed during this hour (None if no bids)
+    high = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    # watcher count sampled during this hour (None if never sampled)
+    watchers = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ('listing', 'hour')
+        ordering = ['listing', 'hour']
+
+    def __str__(self):
+        return f"{self.listing_id} @ {self.hour:%Y-%m-%d %H:00}"
+
+
+class RollupState(models.Model):
+    """High-water marks of the incremental rollup jobs."""
+    name = models.CharField(max_length=64, primary_key=True)
+    high_water = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.name}: {self.high_water}"
+
+
+class ListingRecommendation(models.Model):
+    """
+    "People who watched or bid on this also engaged with…": the top-K
+    co-engaged listings of ``listing``, precomputed by
+    ``manage.py build_recommendations``.
+    """
+    listing = models.ForeignKey(
+        Listing,
+        on_delete=models.CASCADE,
+        related_name="recommendations"
+    )
+    recommended = models.ForeignKey(
+        Listing,
+        on_delete=models.CASCADE,
+        related_name="recommended_in"
+    )
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        unique_together = ('listing', 'rank')
+        ordering = ['listing', 'rank']
+
+    def __str__(self):
+        return f"{self.listing_id} -> {self.recommended_id} (#{self.rank})"
+
+
+class ProfileRun(models.Model):
+    """
+    One profiled request (see auctions.profiling): timings, every SQL
+    statement and the cProfile data, downloadable as a .prof file.
+    """
+    created_at = models.DateTimeField(default=timezone.now)
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=500)
+    view_name = models.CharField(max_length=200, blank=True)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+"
+    )
+    # "header", "query" or "sample"
+    trigger = models.CharField(max_length=10)
+    status_code = models.PositiveSmallIntegerField()
+    total_ms = models.FloatField()
+    sql_count = models.PositiveIntegerField()
+    sql_ms = models.FloatField()
+    template_ms = models.FloatField()
+    # [{"alias", "sql", "ms"}, ...] and [{"name", "depth", "ms"}, ...]
+    queries = models.JSONField(default=list)
+    templates = models.JSONField(default=list)
+    # pstats-compatible (marshal) dump, and its top entries as text
+    profile = models.BinaryField()
+    summary = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.total_ms:.0f} ms)"
+
+
+class SlowQueryStat(models.Model):
+    """
+    Queries over SLOW_QUERY_MS, aggregated by normalised SQL fingerprint
+    (see auctions.slowlog).
+    """
+    fingerprint = models.CharField(max_length=40, primary_key=True)
+    pattern = models.TextField()
+    count = models.PositiveIntegerField(default=0)
+    total_ms = models.FloatField(default=0)
+    max_ms = models.FloatField(default=0)
+    first_seen = models.DateTimeField(default=timezone.now)
+    last_seen = models.DateTimeField(default=timezone.now)
+    # where the most recent occurrence came from
+    last_view = models.CharField(max_length=200, blank=True)
+    last_frame = models.CharField(max_length=300, blank=True)
+    # latest sampled EXPLAIN (ANALYZE, BUFFERS) output (Postgres only)
+    explain = models.TextField(blank=True)
+    explained_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-total_ms']
+
+    def __str__(self):
+        return self.pattern[:80]
@@ -0,0 +1,142 @@
+"""
+Opt-in request profiling.
+
+With PROFILING_ENABLED, staff can profile a request by adding the
+PROFILING_QUERY_PARAM query flag or the PROFILING_HEADER header, and a
+PROFILING_SAMPLE_RATE fraction of all requests is profiled at random. A
+profiled request runs under cProfile with every SQL statement and template
+render timed, and is stored as a ProfileRun (see the admin). Without
+PROFILING_ENABLED the middleware removes itself at startup.
+"""
+
+import contextvars
+import cProfile
+import io
+import marshal
+import pstats
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.template.base import Template
+
+from .models import ProfileRun
+
+MAX_QUERIES = 1000
+
+_recorder = contextvars.ContextVar("profile_recorder", default=None)
+_hook_installed = False
+
+
+class Recorder:
+    """Collects SQL and template timings of the request being profiled."""
+
+    def __init__(self):
+        self.queries = []
+        self.sql_count = 0
+        self.sql_ms = 0.0
+        self.templates = []
+        self.depth = 0
+
+    def sql_wrapper(self, alias):
+        def wrapper(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                ms = (time.perf_counter() - started) * 1000
+                self.sql_count += 1
+                self.sql_ms += ms
+                if len(self.queries) < MAX_QUERIES:
+                    self.queries.append({"alias": alias, "sql": sql, "ms": round(ms, 3)})
+        return wrapper
+
+    @property
+    def template_ms(self):
+        # nested renders (extends/include) are inside their parent's time
+        return sum(t["ms"] for t in self.templates if t["depth"] == 0)
+
+
+def install_template_hook():
+    """Time Template._render while a Recorder is active (like Django's test instrumentation)."""
+    global _hook_installed
+    if _hook_installed:
+        return
+    original = Template._render
+
+    def _render(self, context):
+        recorder = _recorder.get()
+        if recorder is None:
+            return original(self, context)
+        depth = recorder.depth
+        entry = {"name": self.origin.template_name if self.origin else None, "depth": depth}
+        recorder.templates.append(entry)  # in start order, so parents precede includes
+        recorder.depth += 1
+        started = time.perf_counter()
+        try:
+            return original(self, context)
+        finally:
+            recorder.depth = depth
+            entry["ms"] = round((time.perf_counter() - started) * 1000, 3)
+
+    Template._render = _render
+    _hook_installed = True
+
+
+def trigger(request):
+    """Why ``request`` should be profiled ("query", "header", "sample"), or None."""
+    if settings.PROFILING_QUERY_PARAM in request.GET:
+        reason = "query"
+    elif request.headers.get(settings.PROFILING_HEADER):
+        reason = "header"
+    else:
+        reason = None
+    if reason and request.user.is_staff:
+        return reason
+    rate = settings.PROFILING_SAMPLE_RATE
+    if rate and random.random() < rate:
+        return "sample"
+    return None
+
+
+def profile_request(get_response, request, reason):
+    recorder = Recorder()
+    profiler = cProfile.Profile()
+    token = _recorder.set(recorder)
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(recorder.sql_wrapper(alias)))
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            response = get_response(request)
+        finally:
+            profiler.disable()
+            total_ms = (time.perf_counter() - started) * 1000
+            _recorder.reset(token)
+
+    summary = io.StringIO()
+    stats = pstats.Stats(profiler, stream=summary)
+    stats.sort_stats("cumulative").print_stats(40)
+    match = request.resolver_match
+    user = getattr(request, "user", None)
+    run = ProfileRun.objects.create(
+        method=request.method,
+        path=request.get_full_path()[:500],
+        view_name=match.view_name if match else "",
+        user=user if user is not None and user.is_authenticated else None,
+        trigger=reason,
+        status_code=response.status_code,
+        total_ms=total_ms,
+        sql_count=recorder.sql_count,
+        sql_ms=recorder.sql_ms,
+        template_ms=recorder.template_ms,
+        queries=recorder.queries,
+        templates=recorder.templates,
+        profile=marshal.dumps(stats.stats),
+        summary=summary.getvalue(),
+    )
+    response["X-Profile-Id"] = str(run.pk)
+    return response
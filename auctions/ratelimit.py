@@ -0,0 +1,137 @@
+"""
+Token-bucket rate limiting for expensive endpoints.
+
+Each (scope, client) pair has a bucket holding up to N tokens that refills
+at N per period (RATE_LIMITS, e.g. "10/m"); a request takes one token or is
+answered with 429 before the view runs. Clients are identified by IP and/or
+by the user id stored in the session: no password hash or user lookup
+happens for a rejected request, and an IP-only limit needs no database
+query. A "user" limit reads the session, which is one SELECT with the "db"
+session engine (a cache hit with "cached_db", see DJANGO_SESSION_MODE).
+Buckets live in the shared cache; if it is unavailable, a per-process dict
+is used instead. Concurrent requests may race on a bucket
+(read-modify-write), which makes the limit approximate.
+"""
+
+import math
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import cache
+from django.core.cache.backends.dummy import DummyCache
+from django.http import HttpResponse
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+LOCAL_MAX_KEYS = 10000
+
+_local = {}
+_local_lock = threading.Lock()
+
+
+def parse_rate(rate):
+    """"10/m" -> (capacity 10, refill 10/60 tokens per second)."""
+    count, period = rate.split("/")
+    count = int(count)
+    return count, count / PERIODS[period.strip().lower()[0]]
+
+
+def client_ip(request):
+    if settings.RATE_LIMIT_TRUST_X_FORWARDED_FOR:
+        forwarded = request.META.get("HTTP_X_FORWARDED_FOR", "")
+        if forwarded:
+            # the last hop is the one our proxy appended; earlier ones are client-supplied
+            return forwarded.split(",")[-1].strip()
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def client_keys(request, kinds):
+    keys = []
+    for kind in kinds:
+        if kind == "ip":
+            keys.append(f"ip:{client_ip(request)}")
+        elif kind == "user":
+            user_id = request.session.get(SESSION_KEY) if hasattr(request, "session") else None
+            if user_id is not None:
+                keys.append(f"user:{user_id}")
+    return keys
+
+
+def _take(state, now, capacity, refill):
+    """Apply one request to a bucket. Returns (new_state, seconds_to_wait)."""
+    tokens, stamp = state if state else (capacity, now)
+    tokens = min(capacity, tokens + (now - stamp) * refill)
+    if tokens >= 1:
+        return (tokens - 1, now), 0
+    return (tokens, now), (1 - tokens) / refill
+
+
+def _take_shared(keys, now, capacity, refill, ttl):
+    states = cache.get_many(keys)
+    updates, wait = {}, 0
+    for key in keys:
+        updates[key], key_wait = _take(states.get(key), now, capacity, refill)
+        wait = max(wait, key_wait)
+    cache.set_many(updates, ttl)
+    return wait
+
+
+def _take_local(keys, now, capacity, refill):
+    wait = 0
+    with _local_lock:
+        if len(_local) > LOCAL_MAX_KEYS:
+            _local.clear()
+        for key in keys:
+            _local[key], key_wait = _take(_local.get(key), now, capacity, refill)
+            wait = max(wait, key_wait)
+    return wait
+
+
+def check(request, scope, kinds=("ip",)):
+    """Take a token from each of the client's buckets; seconds to wait (0 = allowed)."""
+    rate = settings.RATE_LIMITS.get(scope)
+    if not settings.RATE_LIMIT_ENABLED or not rate:
+        return 0
+    capacity, refill = parse_rate(rate)
+    keys = [f"ratelimit:{scope}:{key}" for key in client_keys(request, kinds)]
+    if not keys:
+        return 0
+    now = time.time()
+    if not isinstance(cache, DummyCache):
+        try:
+            # a bucket is full again after capacity / refill seconds
+            return _take_shared(keys, now, capacity, refill, math.ceil(capacity / refill) + 1)
+        except Exception:
+            pass  # cache backend down: limit per process instead
+    return _take_local(keys, now, capacity, refill)
+
+
+def too_many_requests(retry_after):
+    seconds = max(1, math.ceil(retry_after))
+    response = HttpResponse(
+        f"Too many requests. Please try again in {seconds} seconds.\n",
+        status=429,
+        content_type="text/plain",
+    )
+    response["Retry-After"] = str(seconds)
+    return response
+
+
+def ratelimit(scope, kinds=("ip",), methods=("POST",), when=None):
+    """
+    View decorator: limit ``methods`` requests (and only those for which
+    ``when(request)`` is true, if given) by the RATE_LIMITS[scope] rate,
+    with one bucket per entry of ``kinds`` ("ip", "user").
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method in methods and (when is None or when(request)):
+                retry_after = check(request, scope, kinds)
+                if retry_after:
+                    return too_many_requests(retry_after)
+            return view(request, *args, **kwargs)
+        return wrapped
+    return decorator
@@ -0,0 +1,127 @@
+"""
+Co-engagement recommendations: listings that users who watched or bid on X
+also watched or bid on.
+
+Each user's engagement is a sparse binary vector over listings; the score of
+(X, Y) is the cosine similarity of the two listings' user vectors,
+co(X, Y) / sqrt(users(X) * users(Y)). Co-occurrences are counted per user in
+batches, so only the non-zero pairs are ever materialised. The top K per
+listing are stored in ListingRecommendation and read with one query.
+"""
+
+import heapq
+import math
+from collections import Counter, defaultdict
+from itertools import islice
+
+from django.db import transaction
+
+from .models import Bid, Listing, ListingRecommendation, User, Watchlist
+
+TOP_K = 6
+# users engaged with more listings than this are skipped: they add
+# quadratic work and little signal (bulk watchers, bots)
+MAX_USER_LISTINGS = 200
+
+
+def _engagement(batch_size):
+    """Yield {user_id: set(listing_ids)} for consecutive batches of users."""
+    last = 0
+    while True:
+        user_ids = list(
+            User.objects.filter(id__gt=last).order_by("id").values_list("id", flat=True)[:batch_size]
+        )
+        if not user_ids:
+            return
+        low, high = user_ids[0], user_ids[-1]
+        engaged = defaultdict(set)
+        for model, user_field in ((Watchlist, "user_id"), (Bid, "bidder_id")):
+            pairs = (
+                model.objects.filter(**{f"{user_field}__gte": low, f"{user_field}__lte": high})
+                .order_by()
+                .values_list(user_field, "listing_id")
+                .distinct()
+            )
+            for user_id, listing_id in pairs.iterator(chunk_size=batch_size):
+                engaged[user_id].add(listing_id)
+        yield engaged
+        last = high
+
+
+def compute(top_k=TOP_K, batch_size=1000, max_user_listings=MAX_USER_LISTINGS):
+    """
+    Returns ``({listing_id: [(recommended_id, score), ...]}, stats)``.
+    Only active listings are recommended.
+    """
+    popularity = Counter()
+    co = defaultdict(Counter)
+    skipped = users = 0
+    for engaged in _engagement(batch_size):
+        for listings in engaged.values():
+            if len(listings) > max_user_listings:
+                skipped += 1
+                continue
+            users += 1
+            popularity.update(listings)
+            if len(listings) < 2:
+                continue
+            ordered = sorted(listings)
+            for i, x in enumerate(ordered):
+                row = co[x]
+                for y in ordered[i + 1:]:
+                    row[y] += 1
+    # co only holds x < y; mirror it while scoring
+    active = set(Listing.objects.filter(active=True).values_list("id", flat=True))
+    scored = defaultdict(list)
+    for x, row in co.items():
+        for y, count in row.items():
+            score = count / math.sqrt(popularity[x] * popularity[y])
+            if y in active:
+                scored[x].append((score, count, y))
+            if x in active:
+                scored[y].append((score, count, x))
+    result = {
+        listing_id: [(y, score) for score, _, y in heapq.nlargest(top_k, candidates)]
+        for listing_id, candidates in scored.items()
+    }
+    stats = {"users": users, "skipped_users": skipped, "listings": len(result)}
+    return result, stats
+
+
+@transaction.atomic
+def store(result, batch_size=1000):
+    """
+    Replace all stored recommendations with ``result``, in one transaction so
+    readers see either the old set or the new one. Listings deleted since
+    ``compute`` ran (archived, see auctions.archive) are left out.
+    """
+    ids = set(result)
+    for recommended in result.values():
+        ids.update(y for y, _ in recommended)
+    existing = set(Listing.objects.filter(pk__in=ids).values_list("id", flat=True))
+
+    ListingRecommendation.objects.all().delete()
+    rows = (
+        ListingRecommendation(listing_id=x, recommended_id=y, rank=rank, score=score)
+        for x, recommended in result.items()
+        if x in existing
+        for rank, (y, score) in enumerate(
+            ((y, score) for y, score in recommended if y in existing), start=1
+        )
+    )
+    created = 0
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return created
+        ListingRecommendation.objects.bulk_create(batch)
+        created += len(batch)
+
+
+def recommended_listings(listing, limit=TOP_K):
+    """The stored recommendations for ``listing`` that are still active."""
+    return (
+        Listing.objects.filter(recommended_in__listing=listing, active=True)
+        .with_prices()
+        .order_by("recommended_in__rank")[:limit]
+    )
@@ -0,0 +1,162 @@
+"""
+Incremental hourly rollups behind the seller dashboard.
+
+``roll_up_bids`` folds new Bid rows into ListingHourlyStats, remembering the
+last processed Bid.id in RollupState so each bid is counted exactly once.
+Bids younger than ``lag`` seconds are left for the next run: ids are assigned
+at insert, so a short lag keeps a slow transaction's lower id from being
+skipped. ``sample_watchers`` records the current watcher count of active
+listings in the current hour's bucket.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Max, Sum
+from django.utils import timezone
+
+from .models import ArchivedListing, Bid, Listing, ListingHourlyStats, RollupState
+
+BIDS_STATE = "hourly_bids"
+
+
+def truncate_hour(dt):
+    return dt.replace(minute=0, second=0, microsecond=0)
+
+
+def _upsert(buckets, apply):
+    """
+    Merge ``buckets`` ({(listing_id, hour): value}) into ListingHourlyStats
+    using ``apply(row, value)``; one read, one bulk update and one bulk insert.
+    """
+    if not buckets:
+        return
+    listing_ids = {listing_id for listing_id, _ in buckets}
+    hours = {hour for _, hour in buckets}
+    existing = {
+        (row.listing_id, row.hour): row
+        for row in ListingHourlyStats.objects.filter(listing_id__in=listing_ids, hour__in=hours)
+    }
+    to_create = []
+    for key, value in buckets.items():
+        row = existing.get(key)
+        if row is None:
+            row = ListingHourlyStats(listing_id=key[0], hour=key[1])
+            to_create.append(row)
+        apply(row, value)
+    ListingHourlyStats.objects.bulk_update(
+        [row for key, row in existing.items() if key in buckets], ["bids", "high", "watchers"]
+    )
+    ListingHourlyStats.objects.bulk_create(to_create)
+
+
+def _add_bids(row, value):
+    count, high = value
+    row.bids += count
+    if row.high is None or high > row.high:
+        row.high = high
+
+
+def roll_up_bids(batch_size=5000, lag=30):
+    """
+    Process one batch of new bids. Returns the number of bids consumed
+    (0 when caught up).
+    """
+    horizon = timezone.now() - timedelta(seconds=lag)
+    with transaction.atomic():
+        # the row lock serialises concurrent runs
+        state, _ = RollupState.objects.select_for_update().get_or_create(name=BIDS_STATE)
+        bids = list(
+            Bid.objects.filter(id__gt=state.high_water, timestamp__lt=horizon)
+            .order_by("id")
+            .values_list("id", "listing_id", "amount", "timestamp")[:batch_size]
+        )
+        if not bids:
+            return 0
+        buckets = defaultdict(lambda: [0, None])
+        for _, listing_id, amount, timestamp in bids:
+            bucket = buckets[(listing_id, truncate_hour(timestamp))]
+            bucket[0] += 1
+            if bucket[1] is None or amount > bucket[1]:
+                bucket[1] = amount
+        _upsert(buckets, _add_bids)
+        state.high_water = bids[-1][0]
+        state.updated_at = timezone.now()
+        state.save()
+    return len(bids)
+
+
+def _set_watchers(row, value):
+    row.watchers = value
+
+
+def sample_watchers():
+    """Store the watcher count of every watched active listing in this hour's bucket."""
+    hour = truncate_hour(timezone.now())
+    counts = (
+        Listing.objects.filter(active=True, watched_by__isnull=False)
+        .values("id")
+        .annotate(watchers=Count("watched_by"))
+        .order_by()
+    )
+    with transaction.atomic():
+        buckets = {(row["id"], hour): row["watchers"] for row in counts}
+        _upsert(buckets, _set_watchers)
+    return len(buckets)
+
+
+def seller_dashboard_data(user, hours=48):
+    """
+    Per-listing summary and hourly series for ``user``'s listings, read from
+    the rollups only.
+    """
+    since = truncate_hour(timezone.now()) - timedelta(hours=hours - 1)
+    listings = list(
+        Listing.objects.filter(owner=user)
+        .order_by("-active", "-created_at")
+        .values("id", "title", "active", "starting_bid")
+    )
+    # archived listings keep their rollups (no join: the Listing row is gone)
+    listings.extend(
+        {**row, "active": False, "starting_bid": row.pop("final_price")}
+        for row in ArchivedListing.objects.filter(owner=user)
+        .order_by("-created_at")
+        .values("id", "title", "final_price")
+    )
+    ids = [listing["id"] for listing in listings]
+    totals = {
+        row["listing_id"]: row
+        for row in ListingHourlyStats.objects.filter(listing_id__in=ids)
+        .values("listing_id")
+        .annotate(total_bids=Sum("bids"), high=Max("high"))
+        .order_by()
+    }
+    series = defaultdict(list)
+    for row in (
+        ListingHourlyStats.objects.filter(listing_id__in=ids, hour__gte=since)
+        .order_by("hour")
+        .values("listing_id", "hour", "bids", "high", "watchers")
+    ):
+        series[row.pop("listing_id")].append(row)
+
+    result = []
+    for listing in listings:
+        total = totals.get(listing["id"], {})
+        points = series.get(listing["id"], [])
+        # price progression: running maximum over the hourly highs
+        price = None
+        for point in points:
+            if point["high"] is not None and (price is None or point["high"] > price):
+                price = point["high"]
+            point["price"] = price
+        watchers = next((p["watchers"] for p in reversed(points) if p["watchers"] is not None), None)
+        result.append({
+            **listing,
+            "total_bids": total.get("total_bids") or 0,
+            "high": total.get("high"),
+            "watchers": watchers,
+            "peak_bids": max((p["bids"] for p in points), default=0),
+            "series": points,
+        })
+    return result
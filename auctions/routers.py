@@ -0,0 +1,46 @@
+"""
+Primary/replica database routing.
+
+Reads go to the "replica" alias only while ``use_replica()`` is active, which
+``auctions.middleware.ReplicaRoutingMiddleware`` does for read-only views.
+Everything else (writes, ``select_for_update``, POST handlers, migrations)
+stays on "default".
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+REPLICA_ALIAS = "replica"
+
+_read_alias = ContextVar("auctions_read_alias", default=None)
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+@contextmanager
+def use_replica():
+    """Route ORM reads inside the block to the replica (if one is configured)."""
+    token = _read_alias.set(REPLICA_ALIAS if replica_configured() else None)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == "default"
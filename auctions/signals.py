@@ -0,0 +1,22 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .directory import invalidate_directory
+from .history import invalidate_series
+from .models import Bid, Category, Listing
+
+
+@receiver([post_save, post_delete], sender=Listing)
+@receiver([post_save, post_delete], sender=Category)
+def listing_or_category_changed(sender, **kwargs):
+    # new listing, closed/reopened listing, moved/renamed category; after
+    # commit, so a concurrent reader can't re-cache the old directory
+    transaction.on_commit(invalidate_directory)
+
+
+@receiver([post_save, post_delete], sender=Bid)
+def bid_changed(sender, instance, **kwargs):
+    # after commit, so a concurrent reader can't re-cache the pre-bid series
+    listing_id = instance.listing_id
+    transaction.on_commit(lambda: invalidate_series(listing_id))
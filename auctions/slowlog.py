@@ -0,0 +1,142 @@
+"""
+Slow query log.
+
+While a request runs, every statement taking longer than SLOW_QUERY_MS is
+remembered with the innermost project stack frame that issued it. After the
+response is built they are logged (logger "auctions.slow_queries") and
+aggregated into SlowQueryStat by fingerprint: the SQL with literals,
+placeholders and IN lists normalised, so ``... WHERE listing_id = 17`` and
+``... = 42`` count as one query. On Postgres a SLOW_QUERY_EXPLAIN_RATE share
+of slow SELECTs is re-run under EXPLAIN (ANALYZE, BUFFERS), once the response
+has been sent so the client does not wait for the query a second time.
+"""
+
+import hashlib
+import logging
+import random
+import re
+import time
+import traceback
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import SlowQueryStat
+
+logger = logging.getLogger("auctions.slow_queries")
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%s|\?")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*\?\s*,?)+\)", re.IGNORECASE)
+_SPACE = re.compile(r"\s+")
+
+PROJECT_DIR = str(settings.BASE_DIR)
+
+
+def normalize(sql):
+    sql = _STRING.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("IN (...)", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+def fingerprint(pattern):
+    return hashlib.sha1(pattern.encode()).hexdigest()
+
+
+def _caller():
+    """Innermost stack frame in project code (not Django, not this module)."""
+    for frame in reversed(traceback.extract_stack()[:-2]):
+        if (
+            frame.filename.startswith(PROJECT_DIR)
+            and "site-packages" not in frame.filename
+            and not frame.filename.endswith("slowlog.py")
+        ):
+            return f"{frame.filename[len(PROJECT_DIR) + 1:]}:{frame.lineno} in {frame.name}"
+    return ""
+
+
+class SlowQueryCollector:
+    def __init__(self, threshold_ms):
+        self.threshold_ms = threshold_ms
+        self.slow = []
+
+    def wrapper(self, alias):
+        def execute(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                ms = (time.perf_counter() - started) * 1000
+                if ms >= self.threshold_ms:
+                    self.slow.append({
+                        "alias": alias,
+                        "sql": sql,
+                        "params": None if many else params,
+                        "ms": ms,
+                        "frame": _caller(),
+                    })
+        return execute
+
+
+def explain(alias, sql, params):
+    """EXPLAIN (ANALYZE, BUFFERS) a SELECT on Postgres; None if not applicable."""
+    connection = connections[alias]
+    statement = sql.lstrip().upper()
+    if connection.vendor != "postgresql" or not statement.startswith("SELECT") or "FOR UPDATE" in statement:
+        return None
+    try:
+        # ANALYZE runs the query again: bound it, and never keep anything
+        with transaction.atomic(using=alias):
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL statement_timeout = %s", [settings.SLOW_QUERY_EXPLAIN_TIMEOUT_MS])
+                cursor.execute("EXPLAIN (ANALYZE, BUFFERS) " + sql, params)
+                plan = "\n".join(row[0] for row in cursor.fetchall())
+            transaction.set_rollback(True, using=alias)
+        return plan
+    except DatabaseError as exc:
+        return f"EXPLAIN failed: {exc}"
+
+
+def record(slow, view_name):
+    """
+    Log and aggregate the slow queries of one request. Returns the ones
+    sampled for EXPLAIN, ``[(fingerprint, query), ...]``, for
+    ``explain_sampled``.
+    """
+    now = timezone.now()
+    sampled = []
+    for query in slow:
+        pattern = normalize(query["sql"])
+        key = fingerprint(pattern)
+        logger.warning(
+            "slow query %.1f ms in %s at %s: %s", query["ms"], view_name, query["frame"], pattern
+        )
+        rate = settings.SLOW_QUERY_EXPLAIN_RATE
+        if rate and random.random() < rate:
+            sampled.append((key, query))
+        updates = {
+            "count": F("count") + 1,
+            "total_ms": F("total_ms") + query["ms"],
+            "max_ms": Greatest(F("max_ms"), query["ms"]),
+            "last_seen": now,
+            "last_view": view_name[:200],
+            "last_frame": query["frame"][:300],
+        }
+        if not SlowQueryStat.objects.filter(pk=key).update(**updates):
+            SlowQueryStat.objects.get_or_create(pk=key, defaults={"pattern": pattern, "first_seen": now})
+            SlowQueryStat.objects.filter(pk=key).update(**updates)
+    return sampled
+
+
+def explain_sampled(sampled):
+    """Store the EXPLAIN plans of the queries ``record`` sampled."""
+    for key, query in sampled:
+        plan = explain(query["alias"], query["sql"], query["params"])
+        if plan is not None:
+            SlowQueryStat.objects.filter(pk=key).update(explain=plan, explained_at=timezone.now())
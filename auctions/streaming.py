@@ -0,0 +1,146 @@
+"""
+Streamed rendering for pages whose size grows with a user's history.
+
+The view passes its long lists as ``Rows`` in the context of an ordinary
+template, which places them with ``{{ my_bids }}`` (and may test them with
+``{% if my_bids %}``, a cheap EXISTS). ``render_stream`` renders that
+skeleton up front, so CSRF, messages and context processors behave as
+usual, and then streams it: text up to a list, the list one row template
+per object in keyset-paginated batches, and so on. The first bytes leave as
+soon as the skeleton is rendered and at most one batch is held in memory,
+whatever the length of the history.
+
+Row templates are rendered with the object and ``extra`` only: no request,
+so no context processor output (``user``, ``csrf_token``, ``listing_state``
+...), which would otherwise be recomputed for every row. Anything a row
+needs goes in ``extra``.
+
+Queries made while the body streams run after the view has returned, so
+request-scoped middleware (profiling, slow query log, replica routing)
+does not see them.
+"""
+
+import re
+import uuid
+from gzip import GzipFile
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.http import HttpResponse, StreamingHttpResponse
+from django.template.loader import get_template, render_to_string
+from django.utils.text import StreamingBuffer
+
+BATCH_SIZE = 200
+CHUNK_CHARS = 16 * 1024
+
+
+class Rows:
+    """
+    A queryset rendered object by object with ``template_name`` (the object
+    is available as ``name``). ``order`` is a single concrete field, walked
+    newest first with the primary key as tie-breaker; NULLs come last.
+    """
+
+    def __init__(self, queryset, template_name, name="object", order="pk", extra=None):
+        self.queryset = queryset
+        self.template_name = template_name
+        self.name = name
+        self.order = order
+        self.extra = extra or {}
+        self.marker = ""
+        self._exists = None
+
+    def __bool__(self):
+        if self._exists is None:
+            self._exists = self.queryset.exists()
+        return self._exists
+
+    def __str__(self):
+        return self.marker
+
+    def _after(self, last):
+        if self.order == "pk":
+            return Q(pk__lt=last.pk)
+        value = getattr(last, self.order)
+        if value is None:
+            return Q(**{f"{self.order}__isnull": True, "pk__lt": last.pk})
+        return (
+            Q(**{f"{self.order}__lt": value})
+            | Q(**{self.order: value, "pk__lt": last.pk})
+            | Q(**{f"{self.order}__isnull": True})
+        )
+
+    def batches(self):
+        if self.order == "pk":
+            ordered = self.queryset.order_by("-pk")
+        else:
+            ordered = self.queryset.order_by(F(self.order).desc(nulls_last=True), "-pk")
+        batch = list(ordered[:BATCH_SIZE])
+        while batch:
+            yield batch
+            if len(batch) < BATCH_SIZE:
+                return
+            batch = list(ordered.filter(self._after(batch[-1]))[:BATCH_SIZE])
+
+    def render(self):
+        # without the request (see the module docstring): context
+        # processors would otherwise run once per row
+        template = get_template(self.template_name)
+        for batch in self.batches():
+            yield "".join(
+                template.render({self.name: obj, **self.extra}) for obj in batch
+            )
+
+
+def _chunks(pieces, rows):
+    buffered, size = [], 0
+    for piece in pieces:
+        if piece not in rows:
+            buffered.append(piece)
+            size += len(piece)
+            continue
+        # send what we have before the queries for this list run
+        if buffered:
+            yield "".join(buffered)
+            buffered, size = [], 0
+        for text in rows[piece].render():
+            buffered.append(text)
+            size += len(text)
+            if size >= CHUNK_CHARS:
+                yield "".join(buffered)
+                buffered, size = [], 0
+    if buffered:
+        yield "".join(buffered)
+
+
+def render_stream(request, template_name, context, status=200):
+    """Like ``render``, streaming the ``Rows`` in ``context`` (STREAMING_PAGES)."""
+    token = uuid.uuid4().hex
+    rows = {}
+    for key, value in context.items():
+        if isinstance(value, Rows):
+            value.marker = f"stream-{token}-{key}"
+            rows[value.marker] = value
+    skeleton = render_to_string(template_name, context, request)
+    pieces = re.split("(%s)" % "|".join(map(re.escape, rows)), skeleton) if rows else [skeleton]
+    if not settings.STREAMING_PAGES:
+        return HttpResponse("".join(_chunks(pieces, rows)), status=status)
+    return StreamingHttpResponse(_chunks(pieces, rows), status=status)
+
+
+def compress_sequence(sequence, filename=None):
+    """
+    django.utils.text.compress_sequence, but each chunk is flushed to the
+    client as it is written (Z_SYNC_FLUSH) instead of waiting in zlib's
+    buffer until enough input has accumulated.
+    """
+    buf = StreamingBuffer()
+    with GzipFile(filename=filename, mode="wb", compresslevel=6, fileobj=buf, mtime=0) as zfile:
+        yield buf.read()
+        for item in sequence:
+            if not item:
+                continue
+            zfile.write(item)
+            zfile.flush()
+            yield buf.read()
+    yield buf.read()
@@ -0,0 +1,60 @@
+# auctions/templatetags/asset_tags.py
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html
+
+from auctions import assets
+
+register = template.Library()
+
+_bundles_built = False
+
+
+def _bundles_available():
+    """
+    Whether the local bundles resolve to static URLs. False on a fresh checkout
+    without ``build_assets`` so the layout falls back to the CDN; only a
+    positive answer is remembered, so a worker started before the build picks
+    the bundles up as soon as they exist.
+    """
+    global _bundles_built
+    if not _bundles_built:
+        try:
+            for name in (assets.CSS_BUNDLE, assets.JS_BUNDLE):
+                static(name)  # raises ValueError when missing from the manifest
+        except ValueError:
+            return False
+        _bundles_built = True
+    return True
+
+
+@register.simple_tag
+def asset_styles():
+    """
+    Load the CSS bundle as an ordinary stylesheet (it is small once gzipped and
+    fingerprinted, so it is cached for good after the first visit) and start
+    fetching the JS bundle early.
+    """
+    if not _bundles_available():
+        return format_html(
+            '<link href="{}/css/bootstrap.min.css" rel="stylesheet">\n'
+            '  <link href="{}" rel="stylesheet">',
+            assets.BOOTSTRAP_CDN,
+            static("auctions/css/site-textlogo.css"),
+        )
+    return format_html(
+        '<link rel="stylesheet" href="{}">\n'
+        '  <link rel="preload" href="{}" as="script">',
+        static(assets.CSS_BUNDLE),
+        static(assets.JS_BUNDLE),
+    )
+
+
+@register.simple_tag
+def asset_scripts():
+    if not _bundles_available():
+        return format_html(
+            '<script src="{}/js/bootstrap.bundle.min.js" defer></script>',
+            assets.BOOTSTRAP_CDN,
+        )
+    return format_html('<script src="{}" defer></script>', static(assets.JS_BUNDLE))
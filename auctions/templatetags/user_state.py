@@ -0,0 +1,15 @@
+# auctions/templatetags/user_state.py
+from django import template
+
+register = template.Library()
+
+
+@register.filter
+def state_for(listing_state, listing_id):
+    """
+    {% with state=listing_state|state_for:listing.id %}: the user's
+    {"watching": bool, "status": "winning"/"outbid"/None} for a listing.
+    """
+    if listing_state is None:
+        return {"watching": False, "status": None}
+    return listing_state.get(listing_id)
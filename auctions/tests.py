@@ -1,3 +1,980 @@
-from django.test import TestCase
+import gzip
+import re
+import time
+from datetime import timedelta
+from io import StringIO
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.db import connection, router
+from django.template import engines
+from django.template.base import Lexer, TokenType
+from django.http import HttpResponse
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test.utils import CaptureQueriesContext
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from commerce import settings as project_settings
+from commerce.postgresql import base as pg_base
+from psycopg2 import extensions as pg_extensions
+from psycopg2.pool import PoolError
+
+from . import (
+    archive, assets, bidding, directory, history, profiling, ratelimit, recommendations, rollups,
+    slowlog, streaming, user_state,
+)
+from .admin_tools import EstimatedCountPaginator
+from .middleware import (
+    PRIMARY_PIN_COOKIE, ProfilingMiddleware, ReplicaRoutingMiddleware, SlowQueryMiddleware,
+)
+from .models import (
+    ArchivedListing, AuctionEvent, Bid, Category, Comment, Notification, Listing, ListingHourlyStats, ProfileRun, SlowQueryStat,
+    User, UserAuctionStats, Watchlist,
+)
+from .routers import use_replica
+
+# A replica alias as settings.py configures it for DATABASE_REPLICA_URL. The
+# routing tests only look at the alias the router picks; no query runs on it.
+REPLICA = dict(settings.DATABASES["default"], TEST={"MIRROR": "default"})
+
+
+@mock.patch.dict(settings.DATABASES, {"replica": REPLICA})
+class ReplicaRoutingTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def read_alias(self, method, path, cookies=None):
+        """Alias a view at ``path`` reads from when run through the middleware."""
+        request = getattr(self.factory, method)(path)
+        request.COOKIES.update(cookies or {})
+        seen = []
+
+        def get_response(request):
+            seen.append(Listing.objects.all().db)
+            return HttpResponse()
+
+        ReplicaRoutingMiddleware(get_response)(request)
+        return seen[0]
+
+    def test_router_reads_from_replica_only_inside_use_replica(self):
+        self.assertEqual(Listing.objects.all().db, "default")
+        with use_replica():
+            self.assertEqual(Listing.objects.all().db, "replica")
+        self.assertEqual(Listing.objects.all().db, "default")
+
+    def test_writes_go_to_primary(self):
+        with use_replica():
+            self.assertEqual(router.db_for_write(Listing), "default")
+            self.assertEqual(Listing.objects.select_for_update().db, "default")
+
+    def test_read_only_view_is_served_from_replica(self):
+        self.assertEqual(self.read_alias("get", "/"), "replica")
+        self.assertEqual(self.read_alias("get", "/listing/1"), "replica")
+
+    def test_other_views_and_posts_use_primary(self):
+        self.assertEqual(self.read_alias("get", "/watchlist"), "default")
+        self.assertEqual(self.read_alias("post", "/listing/1"), "default")
+
+    def test_pin_cookie_pins_reads_to_primary(self):
+        pin = str(time.time() + 5)
+        self.assertEqual(self.read_alias("get", "/listing/1", {PRIMARY_PIN_COOKIE: pin}), "default")
+
+    def test_unknown_path_uses_primary(self):
+        self.assertEqual(self.read_alias("get", "/no-such-page"), "default")
+
+    def test_expired_pin_reads_from_replica_again(self):
+        expired = str(time.time() - 1)
+        self.assertEqual(self.read_alias("get", "/listing/1", {PRIMARY_PIN_COOKIE: expired}), "replica")
+
+    def test_no_replica_configured(self):
+        with mock.patch.dict(settings.DATABASES):
+            del settings.DATABASES["replica"]
+            self.assertEqual(self.read_alias("get", "/"), "default")
+
+
+class ReplicaPinTests(TestCase):
+    def post(self, get_response):
+        middleware = ReplicaRoutingMiddleware(get_response)
+        return middleware(RequestFactory().post("/listing/1"))
+
+    def test_write_pins_client_to_primary(self):
+        def get_response(request):
+            Category.objects.create(name="Clocks")
+            return HttpResponse()
+
+        pin = self.post(get_response).cookies[PRIMARY_PIN_COOKIE].value
+        self.assertGreater(float(pin), time.time())
+
+    def test_post_without_a_write_does_not_pin(self):
+        def get_response(request):
+            Category.objects.exists()
+            return HttpResponse(status=400)
+
+        self.assertNotIn(PRIMARY_PIN_COOKIE, self.post(get_response).cookies)
+
+
+class CategoryDirectoryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        directory.invalidate_directory()
+        self.category = Category.objects.create(name="Clocks")
+        self.owner = User.objects.create(username="seller")
+
+    def counts(self):
+        return {entry.name: entry.active_count for entry in directory.get_directory()}
+
+    def test_invalidated_after_commit_only(self):
+        self.assertEqual(self.counts(), {"Clocks": 0})
+        with self.captureOnCommitCallbacks() as callbacks:
+            Listing.objects.create(
+                title="Wall clock", description="x", starting_bid=5,
+                owner=self.owner, category=self.category,
+            )
+            # not committed yet: readers keep the cached directory
+            self.assertEqual(self.counts(), {"Clocks": 0})
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.counts(), {"Clocks": 1})
+
+    def test_other_workers_see_the_new_version(self):
+        self.assertEqual(self.counts(), {"Clocks": 0})
+        Listing.objects.create(
+            title="Wall clock", description="x", starting_bid=5,
+            owner=self.owner, category=self.category,
+        )
+        # another worker bumped the shared version; this process's copy is still fresh
+        cache.set(directory.VERSION_KEY, "other-worker", None)
+        self.assertEqual(self.counts(), {"Clocks": 1})
+
+
+class ProxyBiddingTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create(username="seller")
+        self.alice = User.objects.create(username="alice")
+        self.bob = User.objects.create(username="bob")
+        self.listing = Listing.objects.create(
+            title="Lamp", description="brass", starting_bid=Decimal("10.00"), owner=self.owner,
+        )
+
+    def bid(self, user, amount=None, max_amount=None):
+        _, created = bidding.place_bid(
+            self.listing.pk, user,
+            amount=Decimal(amount) if amount else None,
+            max_amount=Decimal(max_amount) if max_amount else None,
+        )
+        return [(bid.bidder.username, bid.amount) for bid in created]
+
+    def top(self):
+        bid = bidding._top_bid(self.listing)
+        return bid.bidder.username, bid.amount
+
+    def test_first_proxy_bids_the_starting_price(self):
+        self.assertEqual(self.bid(self.alice, max_amount="50"), [("alice", Decimal("10.00"))])
+
+    def test_tie_between_proxies_goes_to_the_earlier_one(self):
+        self.bid(self.alice, max_amount="50")
+        created = self.bid(self.bob, max_amount="50")
+        self.assertEqual(created, [("alice", Decimal("50.00"))])
+        self.assertEqual(self.top(), ("alice", Decimal("50.00")))
+
+    def test_higher_proxy_beats_rival_by_one_increment(self):
+        self.bid(self.alice, max_amount="30")
+        created = self.bid(self.bob, max_amount="50")
+        self.assertEqual(created, [("alice", Decimal("30.00")), ("bob", Decimal("31.00"))])
+
+    def test_proxy_outbids_manual_bids_up_to_its_maximum_only(self):
+        self.bid(self.alice, max_amount="30")
+        self.assertEqual(self.bid(self.bob, amount="20"), [("bob", Decimal("20")), ("alice", Decimal("21.00"))])
+        self.assertEqual(self.bid(self.bob, amount="29.50"), [("bob", Decimal("29.50")), ("alice", Decimal("30.00"))])
+        self.assertEqual(self.bid(self.bob, amount="31"), [("bob", Decimal("31"))])
+        self.assertEqual(self.top(), ("bob", Decimal("31.00")))
+        self.assertFalse(self.listing.bids.filter(bidder=self.alice, amount__gt=Decimal("30")).exists())
+
+    def test_leader_does_not_bid_against_themselves(self):
+        self.bid(self.alice, max_amount="50")
+        self.assertEqual(self.bid(self.alice, max_amount="80"), [])
+        self.assertEqual(self.listing.bids.count(), 1)
+        self.assertEqual(self.top(), ("alice", Decimal("10.00")))
+
+    def test_increment_is_capped_at_the_maximum(self):
+        self.bid(self.alice, max_amount="25.50")
+        self.assertEqual(self.bid(self.bob, amount="25"), [("bob", Decimal("25")), ("alice", Decimal("25.50"))])
+
+    @override_settings(AUCTION_BID_INCREMENT="2.50")
+    def test_configured_increment_capped_against_a_rival_proxy(self):
+        self.bid(self.alice, max_amount="40")
+        created = self.bid(self.bob, max_amount="41")
+        self.assertEqual(created, [("alice", Decimal("40.00")), ("bob", Decimal("41.00"))])
+        self.bid(self.alice, max_amount="100")
+        self.assertEqual(self.top(), ("alice", Decimal("43.50")))
+
+    def test_rejected_bids(self):
+        self.bid(self.alice, amount="15")
+        with self.assertRaises(bidding.BidError):
+            self.bid(self.bob, amount="15")
+        with self.assertRaises(bidding.BidError):
+            self.bid(self.bob, max_amount="12")
+
+
+class LedgerTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create(username="seller")
+        self.alice = User.objects.create(username="alice")
+        self.bob = User.objects.create(username="bob")
+        self.listing = Listing.objects.create(
+            title="Chair", description="oak", starting_bid=Decimal("10.00"), owner=self.owner,
+        )
+
+    def events(self, listing=None):
+        return list(
+            AuctionEvent.objects.filter(listing=listing or self.listing)
+            .values_list("sequence", "kind", "user__username", "amount")
+        )
+
+    def stats(self):
+        return {
+            row.user.username: (row.bids_placed, row.auctions_won, row.amount_won)
+            for row in UserAuctionStats.objects.select_related("user")
+        }
+
+    def run_history(self):
+        bidding.place_bid(self.listing.pk, self.alice, amount=Decimal("15"))
+        bidding.place_bid(self.listing.pk, self.bob, amount=Decimal("20"))
+        bidding.close_listing(self.listing.pk)
+        bidding.reopen_listing(self.listing.pk)
+        bidding.place_bid(self.listing.pk, self.alice, amount=Decimal("25"))
+        bidding.close_listing(self.listing.pk)
+
+    def test_close_and_reopen_append_events_in_sequence(self):
+        self.run_history()
+        self.assertEqual(self.events(), [
+            (1, AuctionEvent.BID_PLACED, "alice", Decimal("15.00")),
+            (2, AuctionEvent.BID_PLACED, "bob", Decimal("20.00")),
+            (3, AuctionEvent.LISTING_CLOSED, None, Decimal("20.00")),
+            (4, AuctionEvent.WINNER_SET, "bob", Decimal("20.00")),
+            (5, AuctionEvent.LISTING_REOPENED, "bob", Decimal("20.00")),
+            (6, AuctionEvent.BID_PLACED, "alice", Decimal("25.00")),
+            (7, AuctionEvent.LISTING_CLOSED, None, Decimal("25.00")),
+            (8, AuctionEvent.WINNER_SET, "alice", Decimal("25.00")),
+        ])
+        self.assertEqual(self.stats(), {
+            "alice": (2, 1, Decimal("25.00")),
+            "bob": (1, 0, Decimal("0.00")),
+        })
+
+    def test_closing_twice_records_nothing(self):
+        bidding.close_listing(self.listing.pk)
+        _, _, closed = bidding.close_listing(self.listing.pk)
+        self.assertFalse(closed)
+        self.assertEqual(self.events(), [(1, AuctionEvent.LISTING_CLOSED, None, None)])
+
+    def test_sequences_are_per_listing(self):
+        other = Listing.objects.create(
+            title="Desk", description="walnut", starting_bid=Decimal("5.00"), owner=self.owner,
+        )
+        bidding.place_bid(self.listing.pk, self.alice, amount=Decimal("15"))
+        bidding.place_bid(other.pk, self.alice, amount=Decimal("6"))
+        self.assertEqual([event[0] for event in self.events(other)], [1])
+
+    def test_replay_rebuilds_stats_and_winner(self):
+        self.run_history()
+        other = Listing.objects.create(
+            title="Desk", description="walnut", starting_bid=Decimal("5.00"), owner=self.owner,
+        )
+        bidding.place_bid(other.pk, self.bob, max_amount=Decimal("9"))
+        bidding.place_bid(other.pk, self.alice, amount=Decimal("7"))
+        bidding.close_listing(other.pk)
+        before = self.stats()
+
+        UserAuctionStats.objects.all().delete()
+        Listing.objects.filter(pk=self.listing.pk).update(winner=None, active=True)
+        # a batch size of 3 splits one listing's events across batches
+        call_command("replay_ledger", batch_size=3, stdout=StringIO())
+
+        self.assertEqual(self.stats(), before)
+        self.listing.refresh_from_db()
+        self.assertFalse(self.listing.active)
+        self.assertEqual(self.listing.winner, self.alice)
+
+
+class SellerRollupTests(TestCase):
+    def test_archiving_keeps_the_hourly_history(self):
+        owner = User.objects.create(username="seller")
+        bidder = User.objects.create(username="bidder")
+        listing = Listing.objects.create(
+            title="Radio", description="valve", starting_bid=Decimal("10.00"), owner=owner,
+        )
+        bidding.place_bid(listing.pk, bidder, amount=Decimal("12"))
+        Bid.objects.update(timestamp=timezone.now() - timedelta(hours=2))
+        self.assertEqual(rollups.roll_up_bids(lag=0), 1)
+        bidding.close_listing(listing.pk)
+        Listing.objects.update(closed_at=timezone.now() - timedelta(days=40))
+
+        self.assertEqual(archive.archive_batch(days=30, batch_size=10), 1)
+        self.assertTrue(ArchivedListing.objects.filter(pk=listing.pk).exists())
+        self.assertEqual(ListingHourlyStats.objects.filter(listing_id=listing.pk).count(), 1)
+
+        [entry] = rollups.seller_dashboard_data(owner)
+        self.assertEqual((entry["id"], entry["active"]), (listing.pk, False))
+        self.assertEqual((entry["total_bids"], entry["high"]), (1, Decimal("12.00")))
+        self.assertEqual([point["bids"] for point in entry["series"]], [1])
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create(username="seller")
+        self.bidder = User.objects.create(username="bidder")
+
+    def closed_listing(self, title, bids=1, days_ago=40):
+        listing = Listing.objects.create(
+            title=title, description="old", starting_bid=Decimal("10.00"), owner=self.owner,
+        )
+        for i in range(bids):
+            bidding.place_bid(listing.pk, self.bidder, amount=Decimal(11 + i))
+        bidding.close_listing(listing.pk)
+        Listing.objects.filter(pk=listing.pk).update(closed_at=timezone.now() - timedelta(days=days_ago))
+        return listing
+
+    def test_archived_listing_page_is_served_from_the_cold_store(self):
+        listing = self.closed_listing("Gramophone", bids=2)
+        self.assertEqual(archive.archive_batch(days=30, batch_size=10), 1)
+        self.assertFalse(Bid.objects.filter(listing_id=listing.pk).exists())
+
+        response = self.client.get(f"/listing/{listing.pk}", HTTP_HOST="localhost", secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "auctions/listing_archived.html")
+        self.assertContains(response, "Gramophone (archived)")
+        self.assertContains(response, "$12.00")
+        self.assertEqual(len(response.context["bids"]), 2)
+
+    def test_open_recent_and_reopened_listings_stay(self):
+        recent = self.closed_listing("Recent", days_ago=5)
+        reopened = self.closed_listing("Reopened")
+        Listing.objects.filter(pk=reopened.pk).update(active=True)
+        Listing.objects.create(title="Open", description="", starting_bid=1, owner=self.owner)
+        self.assertEqual(archive.archive_batch(days=30, batch_size=10), 0)
+        self.assertEqual(Listing.objects.count(), 3)
+        self.assertEqual(Bid.objects.filter(listing__in=[recent, reopened]).count(), 2)
+
+    def test_command_archives_in_batches_up_to_the_limit(self):
+        for i in range(5):
+            self.closed_listing(f"Lot {i}")
+        out = StringIO()
+        call_command("archive_listings", days=30, batch_size=2, max_batches=2, stdout=out)
+        self.assertIn("Archived 4 listing(s) in 2 batch(es).", out.getvalue())
+        self.assertEqual(Listing.objects.count(), 1)
+        self.assertEqual(ArchivedListing.objects.count(), 4)
+
+        out = StringIO()
+        call_command("archive_listings", days=30, batch_size=2, stdout=out)
+        self.assertIn("Archived 1 listing(s) in 1 batch(es).", out.getvalue())
+        self.assertFalse(Listing.objects.exists())
+        self.assertFalse(Bid.objects.exists())
+
+
+class PriceSeriesTests(TestCase):
+    def test_new_bid_is_seen_without_invalidation(self):
+        cache.clear()
+        owner = User.objects.create(username="seller")
+        bidder = User.objects.create(username="bidder")
+        listing = Listing.objects.create(
+            title="Print", description="signed", starting_bid=Decimal("10.00"), owner=owner,
+        )
+        Bid.objects.create(listing=listing, bidder=bidder, amount=Decimal("11"))
+        self.assertEqual(Decimal(history.price_series(listing.pk)["points"][-1]["price"]), 11)
+        # inside the test transaction the on_commit delete never runs, as for
+        # a worker whose cache the committing worker's delete did not reach
+        Bid.objects.create(listing=listing, bidder=bidder, amount=Decimal("14"))
+        self.assertEqual(Decimal(history.price_series(listing.pk)["points"][-1]["price"]), 14)
+
+
+@override_settings(RATE_LIMIT_ENABLED=True, RATE_LIMITS={"comment": "2/m"})
+class CommentRateLimitTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        owner = User.objects.create(username="seller")
+        self.listing = Listing.objects.create(
+            title="Vase", description="ceramic", starting_bid=Decimal("10.00"), owner=owner,
+        )
+        self.page = f"/listing/{self.listing.pk}"
+        self.endpoint = f"/listing/{self.listing.pk}/comments"
+        self.client.force_login(User.objects.create(username="chatty"))
+
+    def post(self, path, data):
+        return self.client.post(path, data, HTTP_HOST="localhost", secure=True)
+
+    def test_listing_page_comment_form(self):
+        statuses = [self.post(self.page, {"add_comment": "1", "content": "hi"}).status_code for _ in range(3)]
+        self.assertEqual(statuses, [302, 302, 429])
+        self.assertEqual(self.listing.comments.count(), 2)
+
+    def test_comments_endpoint(self):
+        statuses = [self.post(self.endpoint, {"content": "hi"}).status_code for _ in range(3)]
+        self.assertEqual(statuses, [201, 201, 429])
+        self.assertEqual(self.listing.comments.count(), 2)
+
+    def test_limit_is_shared_between_both_paths(self):
+        self.post(self.endpoint, {"content": "a"})
+        self.post(self.endpoint, {"content": "b"})
+        response = self.post(self.page, {"add_comment": "1", "content": "c"})
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response)
+
+    def test_reads_are_not_limited(self):
+        statuses = [
+            self.client.get(self.endpoint, HTTP_HOST="localhost", secure=True).status_code
+            for _ in range(3)
+        ]
+        self.assertEqual(statuses, [200, 200, 200])
+
+    def test_forwarded_for_is_ignored_unless_trusted(self):
+        request = RequestFactory().post(
+            "/", REMOTE_ADDR="10.0.0.2", HTTP_X_FORWARDED_FOR="6.6.6.6, 203.0.113.9",
+        )
+        self.assertEqual(ratelimit.client_ip(request), "10.0.0.2")
+        with override_settings(RATE_LIMIT_TRUST_X_FORWARDED_FOR=True):
+            self.assertEqual(ratelimit.client_ip(request), "203.0.113.9")
+
+
+class ListingCommentsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="chatty")
+        self.listing = Listing.objects.create(
+            title="Vase", description="ceramic", starting_bid=Decimal("10.00"), owner=self.user,
+        )
+        self.ids = [
+            Comment.objects.create(listing=self.listing, commenter=self.user, content=f"#{i}").pk
+            for i in range(25)
+        ]
+        self.endpoint = f"/listing/{self.listing.pk}/comments"
+
+    def get(self, query=""):
+        return self.client.get(self.endpoint + query, HTTP_HOST="localhost", secure=True).json()
+
+    def post(self, path, data):
+        return self.client.post(path, data, HTTP_HOST="localhost", secure=True)
+
+    def test_older_pages_walk_back_from_the_newest(self):
+        first = self.get()
+        self.assertEqual([c["id"] for c in first["comments"]], self.ids[5:])
+        self.assertTrue(first["more"])
+        second = self.get(f"?before={first['comments'][0]['id']}")
+        self.assertEqual([c["id"] for c in second["comments"]], self.ids[:5])
+        self.assertFalse(second["more"])
+
+    def test_newer_returns_what_was_posted_after_a_comment(self):
+        page = self.get(f"?after={self.ids[20]}&limit=3")
+        self.assertEqual([c["id"] for c in page["comments"]], self.ids[21:24])
+        self.assertTrue(page["more"])
+        self.assertEqual(self.get(f"?after={self.ids[-1]}"), {"comments": [], "more": False})
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.endpoint + "?before=x", HTTP_HOST="localhost", secure=True)
+        self.assertEqual(response.status_code, 400)
+
+    def test_post_creates_a_comment(self):
+        self.client.force_login(self.user)
+        response = self.post(self.endpoint, {"content": "Lovely glaze"})
+        self.assertEqual(response.status_code, 201)
+        comment = response.json()["comment"]
+        self.assertEqual((comment["commenter"], comment["content"]), ("chatty", "Lovely glaze"))
+        self.assertEqual(self.get(f"?after={self.ids[-1]}")["comments"][0]["id"], comment["id"])
+
+    def test_invalid_and_anonymous_posts(self):
+        self.assertEqual(self.post(self.endpoint, {"content": "hi"}).status_code, 403)
+        self.client.force_login(self.user)
+        response = self.post(self.endpoint, {"content": ""})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("content", response.json()["errors"])
+        self.assertEqual(self.listing.comments.count(), 25)
+
+    @override_settings(RATE_LIMIT_ENABLED=True, RATE_LIMITS={"comment": "1/m"})
+    def test_rate_limited_post(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        self.assertEqual(self.post(self.endpoint, {"content": "first"}).status_code, 201)
+        response = self.post(self.endpoint, {"content": "second"})
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Please try again", response.content.decode())
+        self.assertFalse(self.listing.comments.filter(content="second").exists())
+
+    def test_page_form_fallback_posts_without_the_button(self):
+        # what form.submit() sends: the hidden add_comment field, no button name
+        self.client.force_login(self.user)
+        page = self.client.get(f"/listing/{self.listing.pk}", HTTP_HOST="localhost", secure=True)
+        self.assertContains(page, '<input type="hidden" name="add_comment" value="1">')
+        response = self.post(f"/listing/{self.listing.pk}", {"add_comment": "1", "content": "no js"})
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(self.listing.comments.filter(content="no js").exists())
+
+
+class AssetBundleTests(SimpleTestCase):
+    def test_bundle_keeps_classes_used_only_in_includes(self):
+        # form-control-sm appears in includes/notification.html and nowhere else
+        top_level = "".join(path.read_text() for path in assets.TEMPLATE_DIR.glob("*.html"))
+        self.assertNotIn("form-control-sm", top_level)
+        css = assets.render_bundles()[assets.CSS_BUNDLE]
+        self.assertIn(".form-control-sm", css)
+        self.assertIn(".input-group-sm", css)
+
+    def test_layout_picks_up_bundles_built_after_startup(self):
+        from .templatetags import asset_tags
+
+        def unbuilt(path):
+            if path.startswith("auctions/dist/"):
+                raise ValueError(f"Missing staticfiles manifest entry for '{path}'")
+            return "/static/" + path
+
+        with mock.patch.object(asset_tags, "_bundles_built", False):
+            with mock.patch.object(asset_tags, "static", unbuilt):
+                self.assertIn(assets.BOOTSTRAP_CDN, asset_tags.asset_styles())
+            with mock.patch.object(asset_tags, "static", lambda path: "/static/" + path):
+                styles = asset_tags.asset_styles()
+        self.assertNotIn(assets.BOOTSTRAP_CDN, styles)
+        self.assertIn('<link rel="stylesheet" href="/static/auctions/dist/app.css">', styles)
+        self.assertNotIn("media=\"print\"", styles)
+
+
+class CacheAndSessionSettingsTests(SimpleTestCase):
+    def test_cache_url_selects_backend(self):
+        redis = project_settings._cache_config("rediss://cache.internal:6380/1")
+        self.assertEqual(redis["BACKEND"], "django.core.cache.backends.redis.RedisCache")
+        self.assertEqual(redis["LOCATION"], "rediss://cache.internal:6380/1")
+        self.assertEqual(redis["KEY_PREFIX"], "auction")
+
+        filebased = project_settings._cache_config("file:///var/tmp/dj")
+        self.assertEqual(filebased["BACKEND"], "django.core.cache.backends.filebased.FileBasedCache")
+        self.assertEqual(filebased["LOCATION"], "/var/tmp/dj")
+
+        self.assertEqual(
+            project_settings._cache_config("dummy://"),
+            {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+        )
+
+        locmem = project_settings._cache_config("locmem://")
+        self.assertEqual(locmem["BACKEND"], "django.core.cache.backends.locmem.LocMemCache")
+        self.assertEqual(locmem["LOCATION"], "auction")
+
+    def test_cache_timeout_comes_from_the_environment(self):
+        with mock.patch.dict("os.environ", {"DJANGO_CACHE_TIMEOUT": "60"}):
+            self.assertEqual(project_settings._cache_config("locmem://")["TIMEOUT"], 60)
+
+    def test_session_engine_defaults_follow_the_cache(self):
+        engine = project_settings._session_engine
+        self.assertEqual(engine(None, True), "django.contrib.sessions.backends.cached_db")
+        self.assertEqual(engine(None, False), "django.contrib.sessions.backends.db")
+        self.assertEqual(engine("signed", False), "django.contrib.sessions.backends.signed_cookies")
+        self.assertEqual(engine("cache", True), "django.contrib.sessions.backends.cache")
+
+    def test_unknown_session_mode_is_a_configuration_error(self):
+        with self.assertRaisesMessage(ImproperlyConfigured, "cached_db, cache, signed, db"):
+            project_settings._session_engine("redis", True)
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.info = mock.Mock(transaction_status=pg_extensions.TRANSACTION_STATUS_IDLE)
+
+    def close(self):
+        self.closed = 1
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def make_pool(self, min_size=1, max_size=2, timeout=0.01):
+        self.made = []
+
+        def connect():
+            self.made.append(FakeConnection())
+            return self.made[-1]
+
+        return pg_base.ConnectionPool(min_size, max_size, timeout, connect)
+
+    def test_checkin_hands_the_connection_to_the_next_checkout(self):
+        pool = self.make_pool()
+        self.assertEqual(len(self.made), 1)  # min_size opened up front
+        conn = pool.checkout()
+        self.assertIs(conn, self.made[0])
+        self.assertEqual(pool.snapshot()["pool_in_use"], 1)
+        pool.checkin(conn)
+        self.assertEqual(pool.snapshot(), {
+            "pool_min_size": 1, "pool_max_size": 2, "pool_idle": 1, "pool_in_use": 0,
+        })
+        self.assertIs(pool.checkout(), conn)
+        self.assertEqual(len(self.made), 1)
+
+    def test_closed_connection_is_discarded_on_checkin(self):
+        pool = self.make_pool()
+        conn = pool.checkout()
+        conn.close()
+        pool.checkin(conn)
+        self.assertEqual(pool.snapshot()["pool_idle"], 0)
+        self.assertIsNot(pool.checkout(), conn)
+        self.assertEqual(len(self.made), 2)
+
+    def test_checkout_waits_for_a_slot_then_gives_up(self):
+        pool = self.make_pool(max_size=2)
+        first, second = pool.checkout(), pool.checkout()
+        with self.assertRaisesMessage(PoolError, "max_size=2"):
+            pool.checkout()
+        pool.checkin(first)
+        self.assertIs(pool.checkout(), first)
+        # the failed checkout did not leak a slot
+        pool.checkin(second)
+        pool.checkout()
+
+    def test_forget_pools_leaves_the_inherited_connections_open(self):
+        pool = self.make_pool()
+        conn = pool.checkout()
+        with mock.patch.dict(pg_base._pools, {"default": pool}, clear=True), \
+                mock.patch.dict(pg_base._stats, {}, clear=True):
+            pg_base._record("default", "checkout", 0.002)
+            self.assertEqual(pg_base.pool_stats()["default"]["pool_in_use"], 1)
+            pg_base.forget_pools()
+            self.assertEqual(pg_base.pool_stats(), {})
+        self.assertFalse(conn.closed)
+        self.assertFalse(pool.closed)
+
+    def test_close_pools_closes_every_connection(self):
+        pool = self.make_pool()
+        conn = pool.checkout()
+        with mock.patch.dict(pg_base._pools, {"default": pool}, clear=True), \
+                mock.patch.dict(pg_base._stats, {}, clear=True):
+            pg_base.close_pools()
+            self.assertEqual(pg_base._pools, {})
+        self.assertTrue(conn.closed)
+
+
+class RecommendationTests(TestCase):
+    def setUp(self):
+        owner = User.objects.create(username="seller")
+        self.a, self.b, self.c, self.d = (
+            Listing.objects.create(title=t, description="", starting_bid=1, owner=owner)
+            for t in "ABCD"
+        )
+        engagement = {"u1": "AB", "u2": "AB", "u3": "AC", "u4": "CD"}
+        listings = {"A": self.a, "B": self.b, "C": self.c, "D": self.d}
+        for username, titles in engagement.items():
+            user = User.objects.create(username=username)
+            Watchlist.objects.create(user=user, listing=listings[titles[0]])
+            Bid.objects.create(listing=listings[titles[1]], bidder=user, amount=2)
+
+    def test_listings_are_ranked_by_cosine_similarity(self):
+        result, stats = recommendations.compute()
+        self.assertEqual(stats["users"], 4)
+        # co(A,B)=2, users A=3 B=2: 2/sqrt(6); co(A,C)=1: 1/sqrt(6); co(C,D)=1: 1/sqrt(2)
+        self.assertEqual([y for y, _ in result[self.a.pk]], [self.b.pk, self.c.pk])
+        self.assertEqual([y for y, _ in result[self.c.pk]], [self.d.pk, self.a.pk])
+        self.assertAlmostEqual(result[self.a.pk][0][1], 2 / 6 ** 0.5)
+        self.assertAlmostEqual(result[self.c.pk][0][1], 1 / 2 ** 0.5)
+
+    def test_only_active_listings_are_recommended(self):
+        Listing.objects.filter(pk=self.d.pk).update(active=False)
+        result, _ = recommendations.compute()
+        self.assertEqual([y for y, _ in result[self.c.pk]], [self.a.pk])
+
+    def test_recommended_listings_follow_the_stored_rank(self):
+        recommendations.store(recommendations.compute()[0])
+        self.assertEqual(list(recommendations.recommended_listings(self.c)), [self.d, self.a])
+        self.assertEqual(list(recommendations.recommended_listings(self.c, limit=1)), [self.d])
+        Listing.objects.filter(pk=self.d.pk).update(active=False)
+        self.assertEqual(list(recommendations.recommended_listings(self.c)), [self.a])
+
+    def test_store_skips_listings_deleted_after_scoring(self):
+        result, _ = recommendations.compute()
+        self.d.delete()
+        self.assertEqual(recommendations.store(result), 4)
+        self.assertEqual(list(recommendations.recommended_listings(self.c)), [self.a])
+        self.assertEqual(
+            list(self.c.recommendations.values_list("recommended_id", "rank")), [(self.a.pk, 1)]
+        )
+
+
+class AdminChangelistTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create(username="admin", is_staff=True, is_superuser=True)
+        self.client.force_login(self.admin)
+        self.alice = User.objects.create(username="alice")
+        self.bob = User.objects.create(username="bob")
+        self.listing = Listing.objects.create(
+            title="Lamp", description="", starting_bid=1, owner=self.admin,
+        )
+        Bid.objects.create(listing=self.listing, bidder=self.alice, amount=2)
+        Bid.objects.create(listing=self.listing, bidder=self.bob, amount=3)
+
+    def get(self, path):
+        return self.client.get(path, HTTP_HOST="localhost", secure=True)
+
+    def test_autocomplete_assets_are_loaded_once(self):
+        html = self.get("/admin/auctions/bid/").content.decode()
+        self.assertEqual(html.count("/jquery.min.js"), 1)
+        self.assertEqual(html.count("/select2.full.min.js"), 1)
+        self.assertEqual(html.count("/autocomplete.js"), 1)
+        self.assertIn('id="filter_bidder"', html)
+        self.assertIn('id="filter_listing"', html)
+
+    def test_filter_querystring_narrows_the_changelist(self):
+        response = self.get(f"/admin/auctions/bid/?bidder__id__exact={self.alice.pk}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [bid.bidder for bid in response.context["cl"].result_list], [self.alice]
+        )
+        [spec] = [s for s in response.context["cl"].filter_specs if s.field_path == "bidder"]
+        self.assertEqual(spec.lookup_val, str(self.alice.pk))
+        [all_choice] = spec.choices(response.context["cl"])
+        self.assertFalse(all_choice["selected"])
+        self.assertNotIn("bidder__id__exact", all_choice["query_string"])
+
+    def paginator_count(self, queryset, reltuples):
+        postgres = mock.MagicMock(vendor="postgresql")
+        cursor = postgres.cursor.return_value.__enter__.return_value
+        cursor.fetchone.return_value = (reltuples,)
+        with mock.patch("auctions.admin_tools.connections", {"default": postgres}):
+            count = EstimatedCountPaginator(queryset, 100).count
+        return count, cursor.execute.called
+
+    def test_large_unfiltered_table_uses_the_estimate(self):
+        self.assertEqual(self.paginator_count(Bid.objects.all(), 25000), (25000, True))
+
+    def test_small_table_is_counted_exactly(self):
+        self.assertEqual(self.paginator_count(Bid.objects.all(), 9999), (2, True))
+        # never analysed
+        self.assertEqual(self.paginator_count(Bid.objects.all(), -1), (2, True))
+
+    def test_filtered_changelist_is_counted_exactly(self):
+        queryset = Bid.objects.filter(bidder=self.alice)
+        self.assertEqual(self.paginator_count(queryset, 25000), (1, False))
+
+    def test_other_databases_are_counted_exactly(self):
+        self.assertEqual(EstimatedCountPaginator(Bid.objects.all(), 100).count, 2)
+
+
+@override_settings(PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=0)
+class ProfilingTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create(username="ops", is_staff=True)
+        self.member = User.objects.create(username="member")
+
+    def request(self, user, path="/", **headers):
+        request = RequestFactory().get(path, headers=headers)
+        request.user = user
+        return request
+
+    def test_disabled_middleware_removes_itself(self):
+        with override_settings(PROFILING_ENABLED=False):
+            with self.assertRaises(MiddlewareNotUsed):
+                ProfilingMiddleware(lambda request: HttpResponse())
+
+    def test_query_flag_and_header_are_staff_only(self):
+        self.assertEqual(profiling.trigger(self.request(self.staff, "/?_profile=1")), "query")
+        self.assertEqual(profiling.trigger(self.request(self.staff, X_Profile="1")), "header")
+        self.assertIsNone(profiling.trigger(self.request(self.member, "/?_profile=1")))
+        self.assertIsNone(profiling.trigger(self.request(self.member, X_Profile="1")))
+        self.assertIsNone(profiling.trigger(self.request(self.staff)))
+
+    @override_settings(PROFILING_SAMPLE_RATE=0.25)
+    def test_sample_rate_profiles_any_request(self):
+        with mock.patch("auctions.profiling.random.random", return_value=0.2):
+            self.assertEqual(profiling.trigger(self.request(self.member)), "sample")
+        with mock.patch("auctions.profiling.random.random", return_value=0.3):
+            self.assertIsNone(profiling.trigger(self.request(self.member)))
+
+    def test_profiled_request_is_stored(self):
+        def get_response(request):
+            list(Listing.objects.all())
+            return HttpResponse()
+
+        middleware = ProfilingMiddleware(get_response)
+        response = middleware(self.request(self.staff, "/?_profile=1"))
+        run = ProfileRun.objects.get(pk=response["X-Profile-Id"])
+        self.assertEqual((run.trigger, run.user, run.status_code), ("query", self.staff, 200))
+        self.assertEqual(run.sql_count, 1)
+        self.assertIn("auctions_listing", run.queries[0]["sql"])
+
+        response = middleware(self.request(self.member, "/?_profile=1"))
+        self.assertNotIn("X-Profile-Id", response)
+        self.assertEqual(ProfileRun.objects.count(), 1)
+
+
+class SlowQueryLogTests(TestCase):
+    def slow(self, sql, ms):
+        return {"alias": "default", "sql": sql, "params": None, "ms": ms, "frame": "views.py:1 in index"}
+
+    def test_normalize_folds_literals_placeholders_and_in_lists(self):
+        self.assertEqual(
+            slowlog.normalize("SELECT *  FROM t\nWHERE a = 17 AND b = 'x''y' AND c IN (%s, %s, %s) AND d = 1.5"),
+            "SELECT * FROM t WHERE a = ? AND b = ? AND c IN (...) AND d = ?",
+        )
+        self.assertEqual(slowlog.normalize('SELECT "t1"."id" FROM "t1"'), 'SELECT "t1"."id" FROM "t1"')
+
+    def test_fingerprint_ignores_the_literal_values(self):
+        first = slowlog.fingerprint(slowlog.normalize("SELECT * FROM t WHERE id = 17"))
+        second = slowlog.fingerprint(slowlog.normalize("SELECT * FROM t WHERE id = 42"))
+        other = slowlog.fingerprint(slowlog.normalize("SELECT * FROM u WHERE id = 42"))
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertEqual(len(first), 40)
+
+    def test_record_upserts_one_row_per_fingerprint(self):
+        with self.assertLogs("auctions.slow_queries", "WARNING"):
+            slowlog.record([self.slow("SELECT * FROM t WHERE id = 1", 120)], "index")
+            slowlog.record([
+                self.slow("SELECT * FROM t WHERE id = 2", 300),
+                self.slow("DELETE FROM t", 50),
+            ], "listing")
+        stat = SlowQueryStat.objects.get(pattern="SELECT * FROM t WHERE id = ?")
+        self.assertEqual((stat.count, stat.total_ms, stat.max_ms), (2, 420, 300))
+        self.assertEqual(stat.last_view, "listing")
+        self.assertEqual(SlowQueryStat.objects.count(), 2)
+
+    @override_settings(SLOW_QUERY_MS=0.001, SLOW_QUERY_EXPLAIN_RATE=1)
+    def test_explain_runs_after_the_response_is_sent(self):
+        def get_response(request):
+            list(Listing.objects.all())
+            return HttpResponse()
+
+        request = RequestFactory().get("/")
+        with self.assertLogs("auctions.slow_queries", "WARNING"), \
+                mock.patch("auctions.slowlog.explain", return_value="Seq Scan") as explain:
+            response = SlowQueryMiddleware(get_response)(request)
+            explain.assert_not_called()
+            response.close()
+        explain.assert_called_once()
+        self.assertEqual(SlowQueryStat.objects.get().explain, "Seq Scan")
+
+
+class ListingBadgeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="collector")
+        self.rival = User.objects.create(username="rival")
+        self.seller = User.objects.create(username="seller")
+        self.category = Category.objects.create(name="Clocks")
+        self.client.force_login(self.user)
+        self.add_listings(3)
+
+    def add_listings(self, count):
+        for i in range(count):
+            listing = Listing.objects.create(
+                title=f"Clock {i}", description="", starting_bid=1,
+                owner=self.seller, category=self.category,
+            )
+            Watchlist.objects.create(user=self.user, listing=listing)
+            Bid.objects.create(listing=listing, bidder=self.user, amount=5)
+            if i % 2:
+                Bid.objects.create(listing=listing, bidder=self.rival, amount=6)
+
+    def get(self, path):
+        return self.client.get(path, HTTP_HOST="localhost", secure=True)
+
+    def assertConstantQueries(self, path):
+        self.get(path)  # warm the category directory cache
+        with CaptureQueriesContext(connection) as small:
+            self.get(path)
+        self.add_listings(5)
+        with self.assertNumQueries(len(small)):
+            response = self.get(path)
+        self.assertContains(response, "You're winning", count=5)
+        self.assertContains(response, "Outbid", count=3)
+        self.assertContains(response, ">Watching<", count=8)
+
+    def test_index_badges_take_a_constant_number_of_queries(self):
+        self.assertConstantQueries("/")
+
+    def test_category_badges_take_a_constant_number_of_queries(self):
+        self.assertConstantQueries(f"/categories/{self.category.pk}")
+
+    def test_listing_not_preloaded_is_reported_not_queried(self):
+        state = user_state.ListingState(self.user)
+        listing = Listing.objects.first()
+        with self.assertNumQueries(0), self.assertLogs("auctions.user_state", "WARNING"):
+            self.assertEqual(state.get(listing.pk), {"watching": False, "status": None})
+        with override_settings(DEBUG=True), self.assertRaises(AssertionError):
+            state.get(listing.pk)
+
+
+class StreamedPageTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="collector")
+        self.client.force_login(self.user)
+        self.listing = Listing.objects.create(
+            title="Clock", description="", starting_bid=1, owner=User.objects.create(username="seller"),
+        )
+        # ties on the ordering field across the 200-row batch boundaries
+        start = timezone.now() - timedelta(days=1)
+        Bid.objects.bulk_create(
+            Bid(listing=self.listing, bidder=self.user, amount=1 + i, timestamp=start + timedelta(seconds=i // 7))
+            for i in range(450)
+        )
+        Notification.objects.bulk_create(
+            Notification(recipient=self.user, title=f"Note {i}", created_at=start + timedelta(seconds=i // 7))
+            for i in range(401)
+        )
+
+    def get(self, path):
+        response = self.client.get(path, HTTP_HOST="localhost", secure=True, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        return gzip.decompress(b"".join(response.streaming_content)).decode()
+
+    def test_my_activity_streams_every_bid_gzipped(self):
+        html = self.get("/my_activity")
+        self.assertEqual(html.count("Placed: "), 450)
+        self.assertEqual(html.count("Your highest on this listing"), 1)
+        self.assertTrue(html.rstrip().endswith("</html>"))
+
+    def test_notifications_stream_every_notification_gzipped(self):
+        html = self.get("/notifications")
+        titles = re.findall(r'<h6 class="mb-1">Note (\d+)</h6>', html)
+        self.assertEqual(sorted(map(int, titles)), list(range(401)))
+        self.assertTrue(html.rstrip().endswith("</html>"))
+
+    def test_batches_cover_every_row_once_in_order(self):
+        queryset = Bid.objects.filter(bidder=self.user)
+        rows = streaming.Rows(queryset, "auctions/includes/activity_bid.html", "bid", "timestamp")
+        batches = list(rows.batches())
+        self.assertEqual([len(batch) for batch in batches], [200, 200, 50])
+        walked = [(bid.timestamp, bid.pk) for batch in batches for bid in batch]
+        self.assertEqual(walked, sorted(queryset.values_list("timestamp", "pk"), reverse=True))
+
+    def test_batches_put_nulls_last(self):
+        for i in range(7):
+            Listing.objects.create(title=f"Lot {i}", description="", starting_bid=1, owner=self.user)
+        Listing.objects.filter(title__in=["Lot 1", "Lot 4"]).update(closed_at=timezone.now())
+        queryset = Listing.objects.filter(owner=self.user)
+        with mock.patch.object(streaming, "BATCH_SIZE", 2):
+            rows = streaming.Rows(queryset, "auctions/includes/activity_listing.html", "listing", "closed_at")
+            walked = [listing.title for batch in rows.batches() for listing in batch]
+        self.assertEqual(walked, ["Lot 4", "Lot 1", "Lot 6", "Lot 5", "Lot 3", "Lot 2", "Lot 0"])
+
+    def test_row_templates_do_not_use_context_processors(self):
+        templates = set()
+        original = streaming.render_stream
+
+        def capture(request, template_name, context, status=200):
+            templates.update(v.template_name for v in context.values() if isinstance(v, streaming.Rows))
+            return original(request, template_name, context, status)
+
+        with mock.patch("auctions.views.render_stream", capture):
+            self.get("/my_activity")
+            self.get("/notifications")
+        self.assertEqual(len(templates), 4)
+
+        request = RequestFactory().get("/")
+        request.user = self.user
+        request.session = self.client.session
+        provided = {"debug", "sql_queries"}
+        for processor in engines["django"].engine.template_context_processors:
+            provided.update(processor(request))
+        for name in templates:
+            source = engines["django"].get_template(name).template.source
+            used = set()
+            for token in Lexer(source).tokenize():
+                if token.token_type in (TokenType.VAR, TokenType.BLOCK):
+                    used.update(re.findall(r"[A-Za-z_]\w*", token.contents))
+            self.assertFalse(used & provided, name)
@@ -8,10 +8,17 @@ urlpatterns = [
     path("register", views.register, name="register"),
     path("create", views.create_listing, name="create"),
     path("listing/<int:listing_id>", views.listing_view, name="listing"),
+    path("listing/<int:listing_id>/bids", views.listing_bids, name="listing_bids"),
+    path("listing/<int:listing_id>/bids/series", views.listing_price_series, name="listing_price_series"),
+    path("listing/<int:listing_id>/comments", views.listing_comments, name="listing_comments"),
     path("watchlist", views.watchlist_view, name="watchlist"),
     path("categories", views.categories_view, name="categories"),
     path("categories/<int:category_id>", views.category_listings, name="category_listings"),
     path("my_activity", views.my_activity, name="my_activity"),
+    path("my_activity/sales", views.seller_dashboard, name="seller_dashboard"),
+    path("my_activity/sales.json", views.seller_stats_json, name="seller_stats_json"),
     path("notifications", views.notifications_view, name="notifications"),
+    path("ops/db-pool", views.db_pool_stats, name="db_pool_stats"),
+    path("ops/profiles/<int:run_id>.prof", views.profile_download, name="profile_download"),
 
 ]
@@ -0,0 +1,71 @@
+"""
+The signed-in user's relation to the listings shown on a page: watching,
+winning or outbid. Views call ``listing_state(request).load(listings)`` once
+for the whole grid (two set-based queries); templates read the memoized
+result with the ``state_for`` filter (auctions.templatetags.user_state).
+A listing the view did not load has no badges; it is logged, and an error
+under DEBUG, rather than looked up row by row.
+"""
+
+import logging
+
+from django.conf import settings
+from django.db.models import Max, Q
+
+from .models import Bid, Watchlist
+
+logger = logging.getLogger(__name__)
+
+WINNING = "winning"
+OUTBID = "outbid"
+
+
+class ListingState:
+    def __init__(self, user):
+        self.user = user
+        self.loaded = set()
+        self.watching = set()
+        self.status = {}
+
+    def load(self, listings):
+        """Fetch the state of ``listings`` (Listings or ids) not loaded yet."""
+        ids = {getattr(listing, "pk", listing) for listing in listings} - self.loaded
+        if not ids:
+            return self
+        self.loaded |= ids
+        if not self.user.is_authenticated:
+            return self
+        self.watching.update(
+            Watchlist.objects.filter(user=self.user, listing_id__in=ids)
+            .values_list("listing_id", flat=True)
+        )
+        rows = (
+            Bid.objects.filter(listing_id__in=ids)
+            .values("listing_id")
+            .annotate(top=Max("amount"), mine=Max("amount", filter=Q(bidder=self.user)))
+            .filter(mine__isnull=False)
+            .order_by()
+        )
+        for row in rows:
+            self.status[row["listing_id"]] = WINNING if row["mine"] >= row["top"] else OUTBID
+        return self
+
+    def get(self, listing_id):
+        if listing_id not in self.loaded:
+            # a lookup here would be one more query per row of the grid
+            message = "listing %s was not preloaded with listing_state(request).load()"
+            if settings.DEBUG:
+                raise AssertionError(message % listing_id)
+            logger.warning(message, listing_id)
+        return {
+            "watching": listing_id in self.watching,
+            "status": self.status.get(listing_id),
+        }
+
+
+def listing_state(request):
+    """The request's ListingState, created on first use."""
+    state = getattr(request, "_listing_state", None)
+    if state is None:
+        state = request._listing_state = ListingState(request.user)
+    return state
@@ -1,21 +1,41 @@
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.db import IntegrityError, transaction
-from django.http import HttpResponseRedirect, Http404
+from django.db.models import OuterRef, Subquery
+from django.http import HttpResponse, HttpResponseRedirect, Http404, JsonResponse
 from django.shortcuts import render, get_object_or_404, redirect
 from django.urls import reverse
+from django.utils.dateparse import parse_datetime
 from django.core.mail import send_mail
 from django.conf import settings
 
-from .models import User, Listing, Bid, Comment, Watchlist, Category, Notification
+from commerce.postgresql.base import pool_stats
+
+from . import bidding, comments
+from .ratelimit import ratelimit
+from .streaming import Rows, render_stream
+from .directory import get_directory
+from .history import PAGE_SIZE, bid_page, price_series
+from .recommendations import recommended_listings
+from .user_state import listing_state
+from .rollups import seller_dashboard_data
+from .models import (
+    User, Listing, Bid, Comment, Watchlist, Category, Notification, ProxyBid, UserAuctionStats,
+    ArchivedListing, ProfileRun,
+)
 from .forms import ListingForm, BidForm, CommentForm
 
 
 def index(request):
-    listings = Listing.objects.filter(active=True).order_by('-created_at')
+    listings = list(
+        Listing.objects.filter(active=True).select_related('category').with_prices().order_by('-created_at')
+    )
+    listing_state(request).load(listings)
     return render(request, "auctions/index.html", {"listings": listings})
 
 
+@ratelimit("login")
 def login_view(request):
     if request.method == "POST":
         username = request.POST["username"]
@@ -37,6 +57,7 @@ def logout_view(request):
     return HttpResponseRedirect(reverse("index"))
 
 
+@ratelimit("register")
 def register(request):
     if request.method == "POST":
         username = request.POST["username"]
@@ -69,8 +90,29 @@ def create_listing(request):
     return render(request, "auctions/create.html", {"form": form})
 
 
+def archived_listing_view(request, listing_id):
+    """Read-only page for a listing moved to cold storage (see auctions.archive)."""
+    archived = get_object_or_404(ArchivedListing, pk=listing_id)
+    doc = archived.document()
+    for entry in doc["bids"] + doc["comments"]:
+        entry["timestamp"] = parse_datetime(entry["timestamp"])
+    return render(request, "auctions/listing_archived.html", {
+        "archived": archived,
+        "listing": doc["listing"],
+        "bids": list(reversed(doc["bids"])),
+        "comments": doc["comments"],
+        "user_won": request.user.is_authenticated and archived.winner_id == request.user.id,
+    })
+
+
+# bids take the listing's row lock: limit them per user and per IP
+@ratelimit("bid", kinds=("ip", "user"), when=lambda request: "place_bid" in request.POST)
+@ratelimit("comment", kinds=("ip", "user"), when=lambda request: "add_comment" in request.POST)
 def listing_view(request, listing_id):
-    listing = get_object_or_404(Listing, pk=listing_id)
+    try:
+        listing = Listing.objects.get(pk=listing_id)
+    except Listing.DoesNotExist:
+        return archived_listing_view(request, listing_id)
 
     # Mark notifications for this listing as read for the viewing user
     if request.user.is_authenticated:
@@ -79,8 +121,13 @@ def listing_view(request, listing_id):
     bid_form = BidForm()
     comment_form = CommentForm()
     in_watchlist = False
+    proxy_max = None
     if request.user.is_authenticated:
         in_watchlist = Watchlist.objects.filter(user=request.user, listing=listing).exists()
+        proxy_max = (
+            ProxyBid.objects.filter(bidder=request.user, listing=listing)
+            .values_list('max_amount', flat=True).first()
+        )
 
     error = None
     success = None
@@ -92,20 +139,20 @@ def listing_view(request, listing_id):
             bid_form = BidForm(request.POST)
             if bid_form.is_valid():
                 amount = bid_form.cleaned_data['amount']
+                max_amount = bid_form.cleaned_data['max_amount']
                 with transaction.atomic():
-                    locked_listing = Listing.objects.select_for_update().get(pk=listing.id)
-                    current = locked_listing.current_price()
-                    if amount < locked_listing.starting_bid:
-                        error = "Bid must be at least the starting bid."
-                    elif locked_listing.bids.exists() and amount <= current:
-                        error = "Bid must be greater than the current highest bid."
-                    else:
-                        # create the bid
-                        new_bid = Bid.objects.create(
-                            listing=locked_listing,
-                            bidder=request.user,
-                            amount=amount
+                    try:
+                        # one transaction for the bid and every automatic counter-bid
+                        locked_listing, new_bids = bidding.place_bid(
+                            listing.id, request.user, amount=amount, max_amount=max_amount
                         )
+                    except bidding.BidError as exc:
+                        error = str(exc)
+                    else:
+                        if not new_bids:
+                            # only the hidden maximum changed; nothing visible to announce
+                            return redirect('listing', listing_id=listing.id)
+                        new_bid = new_bids[-1]
                         success = "Your bid was placed."
 
                         # -----------------------------
@@ -114,7 +161,7 @@ def listing_view(request, listing_id):
                         try:
                             notif_title = f"New bid on your listing: {locked_listing.title}"
                             notif_message = (
-                                f"{request.user.username} placed a bid of ${new_bid.amount:.2f} "
+                                f"{new_bid.bidder.username} placed a bid of ${new_bid.amount:.2f} "
                                 f"on your listing \"{locked_listing.title}\"."
                             )
                             listing_url = reverse('listing', args=(locked_listing.id,))
@@ -173,13 +220,10 @@ def listing_view(request, listing_id):
         elif 'close_listing' in request.POST:
             if not request.user.is_authenticated or request.user != listing.owner:
                 raise Http404
-            top_bid = listing.bids.order_by('-amount').first()
-            listing.winner = top_bid.bidder if top_bid else None
-            listing.active = False
-            listing.save()
+            listing, top_bid, closed = bidding.close_listing(listing.id)
 
             # Create in-app notification and include owner email
-            if listing.winner:
+            if closed and listing.winner:
                 notif_title = f"You won the auction: {listing.title}"
                 notif_message = (
                     f"Congratulations — you won the auction \"{listing.title}\" "
@@ -226,22 +270,82 @@ def listing_view(request, listing_id):
     winner_user = listing.winner if listing.winner else (winner_bid.bidder if winner_bid else None)
     user_won = request.user.is_authenticated and (winner_user == request.user) and not listing.active
     current_price = listing.current_price()
+    # newest page only; older pages are fetched from listing_comments on demand
+    page_comments, older_comments = comments.older(listing.id)
 
     context = {
         "listing": listing,
         "bid_form": bid_form,
         "comment_form": comment_form,
         "in_watchlist": in_watchlist,
+        "proxy_max": proxy_max,
         "error": error,
         "success": success,
         "winner_bid": winner_bid,
         "winner_user": winner_user,
         "user_won": user_won,
         "current_price": current_price,
+        "recommendations": recommended_listings(listing),
+        "comments": page_comments,
+        "older_comments": older_comments,
     }
     return render(request, "auctions/listing.html", context)
 
 
+def listing_bids(request, listing_id):
+    """Bid history, newest first, in pages; pass ``before`` from the previous page."""
+    get_object_or_404(Listing.objects.only("id"), pk=listing_id)
+    try:
+        before = int(request.GET["before"]) if request.GET.get("before") else None
+        limit = int(request.GET.get("limit", PAGE_SIZE))
+    except ValueError:
+        return JsonResponse({"error": "invalid cursor or limit"}, status=400)
+    bids, next_cursor = bid_page(listing_id, before=before, limit=limit)
+    return JsonResponse({"bids": bids, "next": next_cursor})
+
+
+@ratelimit("comment", kinds=("ip", "user"))
+def listing_comments(request, listing_id):
+    """
+    GET: comments before ``before`` (older pages) or after ``after`` (new
+    ones), oldest first. POST: add a comment; returns it.
+    """
+    listing = get_object_or_404(Listing.objects.only("id"), pk=listing_id)
+    if request.method == "POST":
+        if not request.user.is_authenticated:
+            return JsonResponse({"error": "login required"}, status=403)
+        form = CommentForm(request.POST)
+        if not form.is_valid():
+            return JsonResponse({"errors": form.errors}, status=400)
+        comment = form.save(commit=False)
+        comment.listing = listing
+        comment.commenter = request.user
+        comment.save()
+        return JsonResponse({"comment": {
+            "id": comment.id,
+            "commenter": request.user.username,
+            "content": comment.content,
+            "timestamp": comment.timestamp,
+        }}, status=201)
+    try:
+        before = int(request.GET["before"]) if request.GET.get("before") else None
+        after = int(request.GET["after"]) if request.GET.get("after") else None
+        limit = int(request.GET.get("limit", comments.PAGE_SIZE))
+    except ValueError:
+        return JsonResponse({"error": "invalid cursor or limit"}, status=400)
+    if after is not None:
+        page, more = comments.newer(listing_id, after, limit=limit)
+    else:
+        page, more = comments.older(listing_id, before=before, limit=limit)
+    return JsonResponse({"comments": page, "more": more})
+
+
+def listing_price_series(request, listing_id):
+    """Downsampled price over time for charts."""
+    get_object_or_404(Listing.objects.only("id"), pk=listing_id)
+    return JsonResponse(price_series(listing_id))
+
+
 @login_required
 def watchlist_view(request):
     items = Watchlist.objects.filter(user=request.user).select_related('listing').order_by('-added_at')
@@ -250,13 +354,13 @@ def watchlist_view(request):
 
 
 def categories_view(request):
-    categories = Category.objects.all().order_by('name')
-    return render(request, "auctions/categories.html", {"categories": categories})
+    return render(request, "auctions/categories.html", {"categories": get_directory()})
 
 
 def category_listings(request, category_id):
     category = get_object_or_404(Category, pk=category_id)
-    listings = category.listings.filter(active=True).order_by('-created_at')
+    listings = list(category.listings.filter(active=True).with_prices().order_by('-created_at'))
+    listing_state(request).load(listings)
     return render(request, "auctions/category_listings.html", {
         "listings": listings,
         "category": category
@@ -266,29 +370,53 @@ def category_listings(request, category_id):
 def my_activity(request):
     user = request.user
 
-    # Won auctions
-    won_listings = Listing.objects.filter(winner=user).order_by('-created_at')
+    # Highest bid by the user on the bid's listing (for the badge)
+    user_top = Bid.objects.filter(listing=OuterRef("listing"), bidder=user).order_by("-amount").values("amount")[:1]
+
+    # Lists grow with the user's history: streamed row by row, see auctions.streaming
+    context = {
+        # Ledger-derived summary (see auctions.ledger)
+        "stats": UserAuctionStats.objects.filter(user=user).first(),
+        "won_listings": Rows(
+            Listing.objects.filter(winner=user).with_prices(),
+            "auctions/includes/activity_listing.html", "listing", "created_at", {"kind": "won"},
+        ),
+        "archived_won": Rows(
+            ArchivedListing.objects.filter(winner=user).defer("payload"),
+            "auctions/includes/activity_archived.html", "archived", "closed_at",
+        ),
+        "listings_created_active": Rows(
+            Listing.objects.filter(owner=user, active=True),
+            "auctions/includes/activity_listing.html", "listing", "created_at", {"kind": "active"},
+        ),
+        "listings_created_closed": Rows(
+            Listing.objects.filter(owner=user, active=False),
+            "auctions/includes/activity_listing.html", "listing", "created_at", {"kind": "closed"},
+        ),
+        "my_bids": Rows(
+            Bid.objects.filter(bidder=user).select_related('listing').annotate(user_top=Subquery(user_top)),
+            "auctions/includes/activity_bid.html", "bid", "timestamp",
+        ),
+    }
+    return render_stream(request, "auctions/my_activity.html", context)
 
-    # User's listings split into active and closed
-    listings_created_active = Listing.objects.filter(owner=user, active=True).order_by('-created_at')
-    listings_created_closed = Listing.objects.filter(owner=user, active=False).order_by('-created_at')
 
-    # User's bids
-    my_bids = Bid.objects.filter(bidder=user).select_related('listing').order_by('-timestamp')
+@login_required
+def seller_dashboard(request):
+    """Hourly bids, price and watchers for the user's listings (rollups only)."""
+    return render(request, "auctions/seller_dashboard.html", {
+        "listings": seller_dashboard_data(request.user),
+    })
 
-    # Highest bid by the user per listing (for the badge)
-    from django.db.models import Max
-    highest_by_listing = my_bids.values('listing').annotate(max_amount=Max('amount'))
-    highest_map = {entry['listing']: entry['max_amount'] for entry in highest_by_listing}
 
-    context = {
-        "won_listings": won_listings,
-        "listings_created_active": listings_created_active,
-        "listings_created_closed": listings_created_closed,
-        "my_bids": my_bids,
-        "highest_map": highest_map,
-    }
-    return render(request, "auctions/my_activity.html", context)
+@login_required
+def seller_stats_json(request):
+    listings = seller_dashboard_data(request.user)
+    for listing in listings:
+        listing["series"] = [
+            {**point, "hour": point["hour"].isoformat()} for point in listing["series"]
+        ]
+    return JsonResponse({"listings": listings})
 
 
 @login_required
@@ -297,4 +425,23 @@ def notifications_view(request):
     if request.method == "POST" and request.POST.get("mark_all_read"):
         notifs.update(read=True)
         return redirect('notifications')
-    return render(request, "auctions/notifications.html", {"notifications": notifs})
+    return render_stream(request, "auctions/notifications.html", {
+        "notifications": Rows(
+            notifs.select_related('listing'), "auctions/includes/notification.html", "n", "created_at",
+        ),
+    })
+
+
+@staff_member_required
+def db_pool_stats(request):
+    """Connection/pool statistics of the worker process serving this request."""
+    return JsonResponse(pool_stats())
+
+
+@staff_member_required
+def profile_download(request, run_id):
+    """cProfile data of a ProfileRun, for pstats/snakeviz."""
+    run = get_object_or_404(ProfileRun, pk=run_id)
+    response = HttpResponse(bytes(run.profile), content_type="application/octet-stream")
+    response["Content-Disposition"] = f'attachment; filename="profile-{run.pk}.prof"'
+    return response
@@ -0,0 +1,61 @@
+"""
+Warm-up for a freshly started process, so the first real request after a
+scale-from-zero doesn't pay for lazy initialisation: database connections
+(TCP + TLS + auth), the URL resolver, compiled templates (kept by the cached
+template loader) and the registered cache warmers (auctions.cache).
+"""
+
+import time
+from pathlib import Path
+
+from django.apps import apps
+from django.db import connections
+from django.template.loader import get_template
+from django.urls import get_resolver, reverse
+
+from .cache import warm_cache
+
+STEPS = ("database", "urls", "templates", "cache")
+
+
+def warm_database():
+    for alias in connections:
+        with connections[alias].cursor() as cursor:
+            cursor.execute("SELECT 1")
+
+
+def warm_urls():
+    resolver = get_resolver()
+    resolver.resolve("/")
+    reverse("index")  # builds the reverse lookup tables
+
+
+def template_names():
+    """Every template shipped in the project's apps (not Django's own)."""
+    for config in apps.get_app_configs():
+        root = Path(config.path) / "templates"
+        if "site-packages" in config.path or not root.is_dir():
+            continue
+        for path in sorted(root.rglob("*.html")):
+            yield path.relative_to(root).as_posix()
+
+
+def warm_templates():
+    for name in template_names():
+        get_template(name)
+
+
+def warm_up(steps=STEPS):
+    """Run the given warm-up steps; returns ``{step: seconds}``."""
+    funcs = {
+        "database": warm_database,
+        "urls": warm_urls,
+        "templates": warm_templates,
+        "cache": warm_cache,
+    }
+    timings = {}
+    for step in steps:
+        start = time.perf_counter()
+        funcs[step]()
+        timings[step] = time.perf_counter() - start
+    return timings
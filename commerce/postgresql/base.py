@@ -0,0 +1,181 @@
+"""
+PostgreSQL backend used for the remote (Supabase) database.
+
+On top of Django's backend it:
+  * times every physical connection (TCP + TLS + auth) and every checkout,
+    exposed through ``pool_stats()``;
+  * optionally keeps a process-wide psycopg2 ``ThreadedConnectionPool`` when
+    ``OPTIONS["pool"]`` is set (the same option name Django >= 5.1 uses), so
+    closing a connection at the end of a request hands it back to the pool
+    instead of tearing down the TLS session.
+"""
+
+import threading
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.postgresql.base import DatabaseWrapper as PostgresDatabaseWrapper
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+from psycopg2 import pool as pg_pool
+
+_pools = {}
+_pools_lock = threading.Lock()
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _record(alias, kind, seconds):
+    with _stats_lock:
+        stats = _stats.setdefault(alias, {
+            "connects": 0,
+            "connect_ms_total": 0.0,
+            "connect_ms_max": 0.0,
+            "checkouts": 0,
+            "checkout_ms_total": 0.0,
+            "checkout_ms_max": 0.0,
+        })
+        ms = seconds * 1000
+        stats[f"{kind}s"] += 1
+        stats[f"{kind}_ms_total"] += ms
+        stats[f"{kind}_ms_max"] = max(stats[f"{kind}_ms_max"], ms)
+
+
+def pool_stats():
+    """Per-alias connection statistics for this process."""
+    with _stats_lock:
+        result = {alias: dict(values) for alias, values in _stats.items()}
+    with _pools_lock:
+        for alias, pool in _pools.items():
+            entry = result.setdefault(alias, {})
+            entry.update(pool.snapshot())
+    return result
+
+
+def close_pools():
+    """
+    Close every pooled connection of this process, e.g. in the gunicorn
+    master before it forks workers.
+    """
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.closeall()
+        _pools.clear()
+    with _stats_lock:
+        _stats.clear()
+
+
+def forget_pools():
+    """
+    Drop this process's pools and stats without closing them: in a forked
+    child the sockets are the parent's, and closing one would end the
+    parent's session too.
+    """
+    with _pools_lock:
+        _pools.clear()
+    with _stats_lock:
+        _stats.clear()
+
+
+class ConnectionPool(pg_pool.ThreadedConnectionPool):
+    """
+    ThreadedConnectionPool that builds connections through Django's backend
+    and blocks (up to ``timeout`` seconds) instead of raising when exhausted.
+    """
+
+    def __init__(self, min_size, max_size, timeout, connect):
+        self._factory = connect
+        self._slots = threading.BoundedSemaphore(max_size)
+        self.timeout = timeout
+        super().__init__(min_size, max_size)
+
+    def _connect(self, key=None):
+        conn = self._factory()
+        if key is not None:
+            self._used[key] = conn
+            self._rused[id(conn)] = key
+        else:
+            self._pool.append(conn)
+        return conn
+
+    def checkout(self):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise pg_pool.PoolError(
+                f"no connection available within {self.timeout}s (max_size={self.maxconn})"
+            )
+        try:
+            return self.getconn()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def checkin(self, conn):
+        try:
+            self.putconn(conn, close=bool(conn.closed))
+        finally:
+            self._slots.release()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "pool_min_size": self.minconn,
+                "pool_max_size": self.maxconn,
+                "pool_idle": len(self._pool),
+                "pool_in_use": len(self._used),
+            }
+
+
+class DatabaseWrapper(PostgresDatabaseWrapper):
+    @property
+    def pool_options(self):
+        return self.settings_dict["OPTIONS"].get("pool")
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        conn_params.pop("pool", None)
+        return conn_params
+
+    def _connect_timed(self, conn_params):
+        start = time.perf_counter()
+        connection = super().get_new_connection(conn_params)
+        _record(self.alias, "connect", time.perf_counter() - start)
+        return connection
+
+    def _get_pool(self, conn_params):
+        with _pools_lock:
+            pool = _pools.get(self.alias)
+            if pool is None:
+                options = self.pool_options
+                if options is True:
+                    options = {}
+                if self.settings_dict["CONN_MAX_AGE"]:
+                    raise ImproperlyConfigured(
+                        "CONN_MAX_AGE must be 0 when OPTIONS['pool'] is enabled."
+                    )
+                pool = _pools[self.alias] = ConnectionPool(
+                    min_size=options.get("min_size", 1),
+                    max_size=options.get("max_size", 4),
+                    timeout=options.get("timeout", 10),
+                    connect=lambda: self._connect_timed(conn_params),
+                )
+            return pool
+
+    def get_new_connection(self, conn_params):
+        if not self.pool_options:
+            return self._connect_timed(conn_params)
+
+        start = time.perf_counter()
+        connection = self._get_pool(conn_params).checkout()
+        _record(self.alias, "checkout", time.perf_counter() - start)
+        # Django's get_new_connection sets this on the wrapper; pooled
+        # connections keep the isolation level they were created with.
+        self.isolation_level = IsolationLevel(
+            self.settings_dict["OPTIONS"].get("isolation_level", IsolationLevel.READ_COMMITTED)
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is not None and self.pool_options:
+            with self.wrap_database_errors:
+                _pools[self.alias].checkin(self.connection)
+            return
+        return super()._close()
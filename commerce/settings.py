@@ -4,7 +4,10 @@ Complete, production-ready defaults with local dev fallbacks.
 """
 
 import os
+import sys
 from pathlib import Path
+from urllib.parse import urlparse
+from django.core.exceptions import ImproperlyConfigured
 import dj_database_url
 from dotenv import load_dotenv
 
@@ -59,10 +62,15 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    # below WhiteNoise, which serves static files pre-compressed
+    "auctions.middleware.GZipMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "auctions.middleware.ProfilingMiddleware",
+    "auctions.middleware.SlowQueryMiddleware",
+    "auctions.middleware.ReplicaRoutingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -73,14 +81,23 @@ TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [os.path.join(BASE_DIR, "templates")],
-        "APP_DIRS": True,
         "OPTIONS": {
+            # Compiled templates are kept for the life of the process and primed
+            # by auctions.warmup (runserver still reloads them on change).
+            "loaders": [
+                ("django.template.loaders.cached.Loader", [
+                    "django.template.loaders.filesystem.Loader",
+                    "django.template.loaders.app_directories.Loader",
+                ]),
+            ],
             "context_processors": [
                 "django.template.context_processors.debug",
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
                 "auctions.context_processors.notifications_count",
+                "auctions.context_processors.category_directory",
+                "auctions.context_processors.listing_state",
             ],
         },
     },
@@ -94,18 +111,50 @@ WSGI_APPLICATION = "commerce.wsgi.application"
 # Supports: local sqlite (for dev/dumpdata) and remote Postgres (Supabase) with SSL.
 _db_url = os.environ.get("DATABASE_URL", "")
 
-if _db_url and _db_url.startswith("sqlite"):
-    # Local sqlite (use dj_database_url.parse to handle sqlite://... strings)
-    DATABASES = {"default": dj_database_url.parse(_db_url)}
-elif _db_url:
+# Remote Postgres connection handling, DJANGO_DB_POOL_MODE:
+#   persistent  one long-lived connection per worker thread (default)
+#   pool        process-wide psycopg2 pool; connections go back to the pool
+#               after each request instead of being closed
+#   pgbouncer   DATABASE_URL points at Supabase's transaction-mode pooler
+#               (port 6543): no server-side cursors. psycopg2 binds
+#               parameters client-side, so no prepared statements are used.
+_db_pool_mode = os.environ.get("DJANGO_DB_POOL_MODE", "persistent")
+
+
+def _database_config(url):
+    if url.startswith("sqlite"):
+        # Local sqlite (use dj_database_url.parse to handle sqlite://... strings)
+        return dj_database_url.parse(url)
     # Remote Postgres (Supabase) — require SSL
-    DATABASES = {
-        "default": dj_database_url.config(
-            default=_db_url,
-            conn_max_age=int(os.environ.get("DJANGO_DB_CONN_MAX_AGE", 600)),
-            ssl_require=True,
-        )
-    }
+    db = dj_database_url.config(
+        default=url,
+        conn_max_age=int(os.environ.get("DJANGO_DB_CONN_MAX_AGE", 600)),
+        conn_health_checks=True,
+        ssl_require=True,
+    )
+    db["ENGINE"] = "commerce.postgresql"
+    db["OPTIONS"].update({
+        "connect_timeout": int(os.environ.get("DJANGO_DB_CONNECT_TIMEOUT", 10)),
+        # TCP keep-alive so idle pooled/persistent connections survive NAT timeouts
+        "keepalives": 1,
+        "keepalives_idle": 30,
+        "keepalives_interval": 10,
+        "keepalives_count": 3,
+    })
+    if _db_pool_mode == "pool":
+        db["CONN_MAX_AGE"] = 0
+        db["OPTIONS"]["pool"] = {
+            "min_size": int(os.environ.get("DJANGO_DB_POOL_MIN_SIZE", 1)),
+            "max_size": int(os.environ.get("DJANGO_DB_POOL_MAX_SIZE", 4)),
+            "timeout": int(os.environ.get("DJANGO_DB_POOL_TIMEOUT", 10)),
+        }
+    elif _db_pool_mode == "pgbouncer":
+        db["DISABLE_SERVER_SIDE_CURSORS"] = True
+    return db
+
+
+if _db_url:
+    DATABASES = {"default": _database_config(_db_url)}
 else:
     # Fallback to a local sqlite file if DATABASE_URL is not set
     DATABASES = {
@@ -115,6 +164,151 @@ else:
         }
     }
 
+# Optional read replica. Read-only views (see auctions.routers) are served
+# from it; writes and anything after a user's own write stay on "default".
+_replica_url = os.environ.get("DATABASE_REPLICA_URL", "")
+if _replica_url:
+    DATABASES["replica"] = _database_config(_replica_url)
+    # Tests run against a single database; the replica alias mirrors it.
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+
+DATABASE_ROUTERS = ["auctions.routers.PrimaryReplicaRouter"]
+# Seconds a client keeps reading from the primary after its own write
+REPLICA_STICKY_SECONDS = int(os.environ.get("DJANGO_REPLICA_STICKY_SECONDS", 15))
+
+# -------------------------
+# Cache
+# -------------------------
+# DJANGO_CACHE_URL selects the backend:
+#   locmem://            per-process memory (default)
+#   file:///var/tmp/dj   file-based, shared by the workers of one instance
+#   redis://host:6379/0  Redis-compatible server (rediss:// for TLS)
+#   dummy://             no caching
+# The test runner always gets a local-memory stand-in.
+TESTING = len(sys.argv) > 1 and sys.argv[1] == "test"
+
+
+def _cache_config(url):
+    parsed = urlparse(url)
+    timeout = int(os.environ.get("DJANGO_CACHE_TIMEOUT", 300))
+    if parsed.scheme in ("redis", "rediss"):
+        return {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": url,
+            "TIMEOUT": timeout,
+            "KEY_PREFIX": "auction",
+        }
+    if parsed.scheme == "file":
+        return {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": parsed.path or os.path.join(BASE_DIR, ".django_cache"),
+            "TIMEOUT": timeout,
+        }
+    if parsed.scheme == "dummy":
+        return {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+    return {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": parsed.netloc or "auction",
+        "TIMEOUT": timeout,
+    }
+
+
+_cache_url = "locmem://" if TESTING else os.environ.get("DJANGO_CACHE_URL", "locmem://")
+CACHES = {"default": _cache_config(_cache_url)}
+# Whether every worker (and instance) sees the same cache. locmem and file
+# caches are per process / per machine, so deletes in one worker (session
+# flush on logout, invalidations) are not seen by the others.
+CACHE_SHARED = urlparse(_cache_url).scheme in ("redis", "rediss")
+
+# -------------------------
+# Sessions
+# -------------------------
+# DJANGO_SESSION_MODE:
+#   cached_db  read through the cache, written to the DB (default with a
+#              shared cache)
+#   cache      cache only (only sensible with a shared Redis cache)
+#   signed     signed cookies, no server-side storage at all
+#   db         Django's default, one query per request (default otherwise:
+#              with a per-process cache, a logout would only drop the
+#              cached session in the worker that handled it)
+_SESSION_ENGINES = {
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "cache": "django.contrib.sessions.backends.cache",
+    "signed": "django.contrib.sessions.backends.signed_cookies",
+    "db": "django.contrib.sessions.backends.db",
+}
+
+
+def _session_engine(mode, cache_shared):
+    mode = mode or ("cached_db" if cache_shared else "db")
+    try:
+        return _SESSION_ENGINES[mode]
+    except KeyError:
+        raise ImproperlyConfigured(
+            f"DJANGO_SESSION_MODE must be one of {', '.join(_SESSION_ENGINES)}, not {mode!r}."
+        )
+
+
+SESSION_ENGINE = _session_engine(os.environ.get("DJANGO_SESSION_MODE"), CACHE_SHARED)
+SESSION_CACHE_ALIAS = "default"
+
+# -------------------------
+# Request profiling
+# -------------------------
+# Off by default; when off the middleware is removed at startup. When on,
+# staff profile a request with ?_profile=1 or an "X-Profile: 1" header, and
+# DJANGO_PROFILING_SAMPLE_RATE (e.g. 0.001) profiles that share of all
+# requests. Results appear in the admin under "Profile runs".
+PROFILING_ENABLED = os.environ.get("DJANGO_PROFILING", "False").lower() in ("1", "true", "yes")
+PROFILING_SAMPLE_RATE = float(os.environ.get("DJANGO_PROFILING_SAMPLE_RATE", 0))
+PROFILING_QUERY_PARAM = "_profile"
+PROFILING_HEADER = "X-Profile"
+
+# -------------------------
+# Slow query log
+# -------------------------
+# Queries slower than DJANGO_SLOW_QUERY_MS (0 = off) are logged to
+# "auctions.slow_queries" and aggregated by fingerprint in the admin
+# ("Slow query stats"). On Postgres, DJANGO_SLOW_QUERY_EXPLAIN_RATE of the
+# slow SELECTs are re-run under EXPLAIN (ANALYZE, BUFFERS) after the
+# response has been sent.
+SLOW_QUERY_MS = float(os.environ.get("DJANGO_SLOW_QUERY_MS", 0))
+SLOW_QUERY_EXPLAIN_RATE = float(os.environ.get("DJANGO_SLOW_QUERY_EXPLAIN_RATE", 0))
+SLOW_QUERY_EXPLAIN_TIMEOUT_MS = int(os.environ.get("DJANGO_SLOW_QUERY_EXPLAIN_TIMEOUT_MS", 5000))
+
+# -------------------------
+# Rate limiting
+# -------------------------
+# Token buckets per scope (see auctions.ratelimit), kept in the cache above.
+# "N/period" allows bursts of N and refills N per period (s, m, h, d).
+# Override with DJANGO_RATE_LIMITS="login=10/m,bid=30/m,comment=5/m".
+RATE_LIMIT_ENABLED = not TESTING and os.environ.get("DJANGO_RATE_LIMIT", "True").lower() in ("1", "true", "yes")
+RATE_LIMITS = {
+    "login": "10/m",     # POSTs per IP
+    "register": "5/h",   # POSTs per IP (password hashing)
+    "bid": "20/m",       # bid POSTs per user and per IP
+    "comment": "10/m",   # comment POSTs per user and per IP
+}
+RATE_LIMITS.update(
+    entry.split("=", 1) for entry in _split_env("DJANGO_RATE_LIMITS") if "=" in entry
+)
+# Off by default: REMOTE_ADDR identifies the client. Behind a proxy that
+# appends the client address to X-Forwarded-For (Koyeb's does) and is the
+# only way in, set DJANGO_RATE_LIMIT_TRUST_X_FORWARDED_FOR=1 to use the
+# last hop instead; a client that can reach gunicorn directly could
+# otherwise pick its own bucket.
+RATE_LIMIT_TRUST_X_FORWARDED_FOR = os.environ.get(
+    "DJANGO_RATE_LIMIT_TRUST_X_FORWARDED_FOR", "False"
+).lower() in ("1", "true", "yes")
+
+# -------------------------
+# Streaming pages
+# -------------------------
+# Pages whose size grows with a user's history (My Activity, notifications)
+# are streamed row by row (see auctions.streaming) and gzip-compressed chunk
+# by chunk. DJANGO_STREAMING_PAGES=False renders them in one piece instead.
+STREAMING_PAGES = os.environ.get("DJANGO_STREAMING_PAGES", "True").lower() in ("1", "true", "yes")
+
 # -------------------------
 # Proxy / SSL header (Koyeb)
 # -------------------------
@@ -166,6 +360,9 @@ USE_TZ = True
 STATIC_URL = "/static/"
 STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+# The test runner renders pages without a collectstatic manifest
+if TESTING:
+    STATICFILES_STORAGE = "django.contrib.staticfiles.storage.StaticFilesStorage"
 
 # -------------------------
 # Email
@@ -193,3 +390,6 @@ LOGGING = {
 DATA_UPLOAD_MAX_MEMORY_SIZE = int(os.environ.get("DATA_UPLOAD_MAX_MEMORY_SIZE", 2621440))  # 2.5MB
 
 # Any additional app-specific settings can go here
+
+# Proxy bidding: step the engine uses when outbidding on a bidder's behalf
+AUCTION_BID_INCREMENT = os.environ.get("AUCTION_BID_INCREMENT", "1.00")
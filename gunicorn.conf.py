@@ -1,5 +1,6 @@
 # gunicorn.conf.py
 import multiprocessing
+import os
 
 # Worker configuration
 workers = 1  # Free tier limitation
@@ -15,3 +16,53 @@ loglevel = 'info'
 
 # Process naming
 proc_name = 'auction'
+
+# Cold start (the service scales to zero)
+# Import Django, the URLconf and compile templates once in the master;
+# workers are forked with all of that already in memory.
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'True').lower() in ('1', 'true', 'yes')
+# Prime the master before the first worker is forked.
+WARM_UP = os.environ.get('DJANGO_WARM_UP', 'True').lower() in ('1', 'true', 'yes')
+
+
+def when_ready(server):
+    if not (preload_app and WARM_UP):
+        return
+    from django.db import connections
+    from auctions.warmup import warm_up
+    from commerce.postgresql.base import close_pools
+
+    timings = warm_up(steps=('urls', 'templates', 'cache'))
+    # Never share database sockets with the forked workers. With
+    # DJANGO_DB_POOL_MODE=pool, close_all() only returns the connection to
+    # the pool, so the pools are closed as well.
+    connections.close_all()
+    close_pools()
+    server.log.info('warm-up (master): %s', _format(timings))
+
+
+def post_fork(server, worker):
+    if not preload_app:
+        return
+    from django.db import connections
+    from commerce.postgresql.base import forget_pools
+
+    # Inherited connection objects and pools belong to the master; drop them unclosed
+    for conn in connections.all(initialized_only=True):
+        conn.connection = None
+    forget_pools()
+
+
+def post_worker_init(worker):
+    if not WARM_UP:
+        return
+    from auctions.warmup import STEPS, warm_up
+
+    # Each worker opens its own database connection (TCP + TLS) before
+    # taking traffic; without preload it also needs everything else.
+    timings = warm_up(steps=('database',) if preload_app else STEPS)
+    worker.log.info('warm-up (worker %s): %s', worker.pid, _format(timings))
+
+
+def _format(timings):
+    return ', '.join(f'{step} {seconds * 1000:.0f} ms' for step, seconds in timings.items())